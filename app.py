@@ -120,9 +120,9 @@ ESCAPE SEQUENCES:
 📋 COMMAND REFERENCE
 ═══════════════════════════════════════════════════════════════════════════════
 
-presto analyze --repo OWNER/REPO --pr NUMBER [--save] [--output file.md]
-presto search --repo OWNER/REPO --pr NUMBER --query "search text"
-presto reply --repo OWNER/REPO --pr NUMBER --comment-id ID --message "text"
+presto analyze --repo OWNER/REPO --pr NUMBER [--save] [--output file.md] [--refresh]
+presto search --repo OWNER/REPO --pr NUMBER --query "search text" [--refresh]
+presto reply --repo OWNER/REPO --pr NUMBER --comment-id ID --message "text" [--refresh]
 presto append [--session-dir DIR] --thread N --content "text" [--author "name"]
 presto post [N] [--session-dir DIR] [--all] [--dry-run] [--yes]
 presto skip [N] [--session-dir DIR] [--unmark] [--list]
@@ -138,30 +138,563 @@ Focus on files marked [NEEDS RESPONSE] and ignore SKIP_* prefixed files.
 """)
 
 
+import io
 import json
+import mmap
 import subprocess
 import sys
-import argparse
 import os
-from typing import Dict, List, Any, Optional
+import re
+import shutil
+import functools
+import hashlib
+from itertools import chain
+from operator import itemgetter
+import http.client
+import tempfile
+import time
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Iterable, Iterator, Tuple
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
+if TYPE_CHECKING:
+    import argparse
+
+try:
+    import orjson  # Optional speedup: pip install presto-pr[fast]
+except ImportError:
+    orjson = None
+
+# Output template for a single `presto search` match
+SEARCH_MATCH_TEMPLATE = (
+    "\n--- Match {i} ---\n"
+    "Type: {type}\n"
+    "ID: {id}\n"
+    "Author: {author}\n"
+    "Created: {created_at}\n"
+    "{review_lines}"
+    "Body: {body_preview}\n"
+    "\n💡 To reply: presto reply --repo {repo} --pr {pr} --comment-id {id} --message '<your response>'"
+)
+
+# Building blocks for per-thread session files (see _format_thread_for_file)
+THREAD_HEADER_TEMPLATE = (
+    "# Thread {thread_num:02d}\n"
+    "\n"
+    "## Metadata\n"
+    "- **Type**: {type}\n"
+    "- **Status**: {status}\n"
+)
+THREAD_SKIP_TEMPLATE = (
+    "- **Skip Reason**: {skip_reason}\n"
+    "- **⏭️ Action**: No response needed\n"
+)
+THREAD_ACTION_LINE = "- **💬 Action**: Response required\n"
+THREAD_ORPHAN_LINE = "- **Note**: Reply to missing comment\n"
+THREAD_MAIN_TEMPLATE = (
+    "\n"
+    "## Main Comment\n"
+    "\n"
+    "**Author**: {author}\n"
+    "**Created**: {created}\n"
+    "**Comment ID**: {id}\n"
+)
+THREAD_FILE_LINE_TEMPLATE = "**File**: `{path}`\n"
+THREAD_LINE_NUMBER_TEMPLATE = "**Line**: {line}\n"
+THREAD_CONTENT_TEMPLATE = (
+    "\n"
+    "### Content\n"
+    "\n"
+    "{body}\n"
+)
+THREAD_REPLIES_HEADER = "\n## Replies\n"
+THREAD_REPLY_TEMPLATE = (
+    "\n"
+    "### Reply {i}\n"
+    "\n"
+    "**Author**: {author}\n"
+    "**Created**: {created}\n"
+    "**Reply ID**: {id}\n"
+    "\n"
+    "#### Content\n"
+    "\n"
+    "{body}\n"
+)
+
+# Fixed sections of session_summary.md (see _create_session_summary)
+SESSION_SUMMARY_HEADER_TEMPLATE = (
+    "# PR {pr_number} Review Session\n"
+    "\n"
+    "**Repository**: {repo}\n"
+    "**PR Title**: {title}\n"
+    "**PR Author**: {author}\n"
+    "**Session Directory**: {session_dir}\n"
+    "**Created**: {created}\n"
+    "\n"
+    "## Statistics\n"
+    "\n"
+    "- **Total Threads**: {total_threads}\n"
+    "- **General Comments**: {general_threads}\n"
+    "- **Review Comments**: {review_threads}\n"
+    "- **Total Replies**: {total_replies}\n"
+    "\n"
+    "## Skip Analysis\n"
+    "\n"
+    "- **Total Skipped**: {skipped}\n"
+    "- **Total Needs Response**: {needs_response}\n"
+    "\n"
+    "### Skip Reasons\n"
+)
+SESSION_SUMMARY_SKIP_ROW = "{n}. ⏭️ **{author}** [SKIP: {skip_type}] - {topic}\n"
+SESSION_SUMMARY_RESPONSE_ROW = "{n}. 💬 **{author}** [NEEDS RESPONSE] - {topic}\n"
+SESSION_SUMMARY_NEXT_STEPS = (
+    "\n"
+    "## Next Steps\n"
+    "\n"
+    "1. **Review thread files**: Focus on files marked [NEEDS RESPONSE]\n"
+    "2. **Skip files marked**: ⏭️ SKIP_* files are automatically filtered out\n"
+    "3. **Systematic responses**: Address each remaining thread systematically\n"
+    "4. **Search specific content**: `presto search --repo <OWNER/REPO> --pr <PR> --query <text>`\n"
+    "5. **Post responses**: `presto reply --repo <OWNER/REPO> --pr <PR> --comment-id <ID> --message <text>`\n"
+    "6. **Draft responses**: `presto append --session-dir <SESSION_DIR> --thread <N> --content <text>`\n"
+    "7. **Post responses**: `presto post --session-dir <SESSION_DIR> --thread <N>`\n"
+    "8. **Post all responses**: `presto post --session-dir <SESSION_DIR> --all`\n"
+)
+
+# Single round-trip query for PR metadata, general comments and review threads
+PR_COMMENTS_QUERY = """
+query($owner: String!, $repo: String!, $pr: Int!) {
+  repository(owner: $owner, name: $repo) {
+    pullRequest(number: $pr) {
+      title
+      author { login }
+      body
+      createdAt
+      state
+      comments(first: 100) {
+        pageInfo { hasNextPage }
+        nodes { id author { login } body createdAt }
+      }
+      reviewThreads(first: 100) {
+        pageInfo { hasNextPage }
+        nodes {
+          isResolved
+          comments(first: 100) {
+            pageInfo { hasNextPage }
+            nodes { databaseId author { login } body createdAt path line replyTo { databaseId } }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+# Server-side projections for the REST fallback: keep only the fields Presto reads
+PR_VIEW_JQ = (
+    '{title, author: {login: .author.login}, body, createdAt, state, '
+    'comments: [.comments[] | {id, author: {login: .author.login}, body, createdAt}]}'
+)
+REVIEW_COMMENTS_JQ = (
+    '.[] | {id, user: {login: .user.login}, body, created_at, path, line, in_reply_to_id}'
+)
+
+# Explicit statements that mark a thread as resolved. Each phrase contains one of
+# the resolution keywords (resolved, fixed, closed, done, completed), so a single
+# case-insensitive alternation replaces the separate keyword and phrase scans.
+RESOLUTION_PHRASES = [
+    'this is resolved', 'marking as resolved', 'resolved in',
+    'fixed in', 'closed by', 'done in', 'completed in'
+]
+RESOLUTION_PHRASE_RE = re.compile('|'.join(map(re.escape, RESOLUTION_PHRASES)), re.IGNORECASE)
+
+# "**Key**: value" thread header lines ("- **Type**:" sits in a list)
+_FIELD_RE = re.compile(r'^(?:- )?\*\*(Comment ID|ID|Type)\*\*:(.*)$', re.MULTILINE)
+# Draft metadata lines; unlike _FIELD_RE there is no "- " form, so bullets in draft text stay content
+_DRAFT_FIELD_RE = re.compile(r'^\*\*(Author|POSTED)\*\*:(.*)$', re.MULTILINE)
+# Draft section header, for scanning memory-mapped thread files
+_DRAFT_HEADER_BYTES = '## 📝 DRAFT RESPONSE'.encode('utf-8')
+# Lines that are not draft text: bold metadata, horizontal rules and blank lines
+_DRAFT_NOISE_RE = re.compile(r'^(?:\*\*.*|---.*|[ \t]*)(?:\n|\Z)', re.MULTILINE)
+
+# Thread filename topics: separators become '_', then anything but word chars and '-' is dropped
+_TOPIC_SEPARATORS = str.maketrans({' ': '_', '/': '_', '\\': '_'})
+_TOPIC_UNSAFE_RE = re.compile(r'[^\w-]')
+
+# Session directory names created by analyze: pr_<number>_review_<timestamp>
+_SESSION_RE = re.compile(r'^pr_[^/]*_review_')
+NO_SESSIONS_MESSAGE = "Could not auto-detect session directory: No session directories found. Run 'presto analyze' first."
+
+# Per-session index of thread number -> thread filename, written by analyze
+SESSION_MANIFEST = "manifest.json"
+
+# Manifests already loaded in this process, keyed by session directory
+_session_manifests: Dict[str, Dict[str, str]] = {}
+
+# Thread file entries from one scan of each session directory (stat results are cached on the entry)
+_session_thread_entries: Dict[str, List[os.DirEntry]] = {}
+
+# Local state lives under ~/.presto (skip registries, caches)
+PRESTO_HOME = os.path.expanduser("~/.presto")
+CACHE_DIR = os.path.join(PRESTO_HOME, "cache")
+USER_CACHE_FILE = os.path.join(CACHE_DIR, "current_user.json")
+USER_CACHE_TTL = 24 * 60 * 60  # seconds
+# Thread resolution has no ETag to revalidate against, so cached comments expire quickly
+PR_CACHE_TTL = 10 * 60  # seconds
+# Page size for the cache's conditional GETs; lists this long are not cached
+COMMENT_PAGE_SIZE = 100
+
+
+def _gh_hosts_file() -> str:
+    """Return the path of gh's auth config (hosts.yml)"""
+    config_dir = os.environ.get('GH_CONFIG_DIR')
+    if not config_dir:
+        xdg = os.environ.get('XDG_CONFIG_HOME', os.path.expanduser("~/.config"))
+        config_dir = os.path.join(xdg, "gh")
+    return os.path.join(config_dir, "hosts.yml")
+
+
+def _gh_identity() -> str:
+    """
+    Fingerprint of the gh account in effect: host, config dir and any token from the
+    environment. Token overrides and host switches never touch hosts.yml.
+    """
+    parts = [os.environ.get('GH_HOST', 'github.com'), _gh_hosts_file()]
+    parts += [os.environ.get(name, '') for name in
+              ('GH_TOKEN', 'GITHUB_TOKEN', 'GH_ENTERPRISE_TOKEN', 'GITHUB_ENTERPRISE_TOKEN')]
+    return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()
+
+
+def _iter_json_values(lines: Iterable[str]) -> Iterator[Any]:
+    """
+    Incrementally decode concatenated JSON values (e.g. gh --paginate/--jq output)
+    from an iterable of text chunks, yielding each value as soon as it is complete.
+    Top-level arrays are flattened so per-page arrays merge into one stream.
+    """
+    decoder = json.JSONDecoder()
+    buf = ''
+    for line in lines:
+        buf += line
+        while True:
+            buf = buf.lstrip()
+            if not buf:
+                break
+            try:
+                value, end = decoder.raw_decode(buf)
+            except json.JSONDecodeError:
+                break  # Value continues on a later line
+            buf = buf[end:]
+            if isinstance(value, list):
+                yield from value
+            else:
+                yield value
+    if buf.strip():
+        raise json.JSONDecodeError("Unterminated JSON value", buf, 0)
+
+
+def _json_loads(data) -> Any:
+    """Parse JSON from str or bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+def _read_json_file(path: str) -> Any:
+    """Read and parse a JSON file"""
+    with open(path, 'rb') as f:
+        return _json_loads(f.read())
+
+
+def _write_json_atomic(path: str, data: Any) -> None:
+    """Write JSON to path via a temp file + os.replace so readers never see partial files"""
+    _write_bytes_atomic(path, _json_dumps(data))
+
+
+def _write_bytes_atomic(path: str, data: bytes) -> None:
+    """Write bytes to path via a temp file + os.replace so readers never see partial files"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _write_text_file(path: str, content: str) -> None:
+    """Write text to path with one encode and a single write loop on a raw fd"""
+    data = content.encode('utf-8')
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _write_text_files(batch: List[Tuple[str, str]]) -> None:
+    """Write a batch of (path, content) pairs prepared ahead of time, overlapping the I/O in threads"""
+    if len(batch) < 2:
+        for path, content in batch:
+            _write_text_file(path, content)
+        return
+    # The files are independent and os.write releases the GIL
+    with ThreadPoolExecutor(max_workers=min(8, len(batch))) as executor:
+        list(executor.map(lambda item: _write_text_file(*item), batch))
+
+
+_EMPTY: Dict[str, Any] = {}
+
+
+def _author_of(comment: Dict[str, Any]) -> str:
+    """Login of a REST (user) or gh pr view (author) comment; '' when GitHub has none"""
+    return (comment.get('user') or comment.get('author') or _EMPTY).get('login') or ''
+
+
+def _created_at(comment: Dict[str, Any]) -> str:
+    """Creation timestamp of a REST (created_at) or gh pr view (createdAt) comment"""
+    return comment.get('created_at') or comment.get('createdAt') or ''
+
+
+def _normalize_comment(comment: Dict[str, Any]) -> None:
+    """Fill in '' for a null body and the '_author' / '_created' fields read by hot paths"""
+    comment['body'] = comment.get('body') or ''
+    comment['_author'] = _author_of(comment)
+    comment['_created'] = _created_at(comment)
+
+
+@functools.lru_cache(maxsize=128)
+def _compile_search_pattern(search_text: str):
+    """Compile (and memoise) a literal, case-insensitive pattern for comment search"""
+    return re.compile(re.escape(search_text), re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=None)
+def _read_cached_github_user() -> Optional[str]:
+    """Return the cached GitHub login if the cache is fresh, else None"""
+    try:
+        cache_mtime = os.path.getmtime(USER_CACHE_FILE)
+        if time.time() - cache_mtime > USER_CACHE_TTL:
+            return None
+        # Logging in/out with gh rewrites hosts.yml, which invalidates the cache
+        try:
+            if os.path.getmtime(_gh_hosts_file()) > cache_mtime:
+                return None
+        except OSError:
+            pass
+        cached = _read_json_file(USER_CACHE_FILE)
+        # Logged in as someone else via env tokens, GH_HOST or GH_CONFIG_DIR
+        if cached.get('identity') != _gh_identity():
+            return None
+        return cached.get('login') or None
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _write_cached_github_user(login: str) -> None:
+    """Persist the GitHub login to the user cache"""
+    try:
+        _write_json_atomic(USER_CACHE_FILE, {'login': login, 'identity': _gh_identity()})
+    except OSError as e:
+        print(f"⚠️  Could not write user cache: {e}")
+    _read_cached_github_user.cache_clear()
+
+
+class GitHubAPIError(Exception):
+    """Raised when the GitHub API answers with an error status"""
+    def __init__(self, status: int, message: str):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+
+
+class RequestNotSentError(ConnectionError):
+    """Raised when a connection failed before the request reached GitHub, so resending it is safe"""
+
+
+class GitHubHTTPClient:
+    """
+    Keep-alive HTTPS client for the GitHub API.
+    
+    Every request in a session reuses one TLS connection instead of forking a
+    gh process (and handshaking again) per call. The token is read from
+    `gh auth token`, so gh remains the single source of authentication.
+    """
+    API_HOST = "api.github.com"
+    
+    def __init__(self, token: str):
+        self.token = token
+        self._conn = None
+    
+    @classmethod
+    def from_gh_cli(cls) -> Optional['GitHubHTTPClient']:
+        """Build a client from the gh CLI token, or None if gh cannot provide one"""
+        # GitHub Enterprise hosts are left to gh, which knows their API endpoints
+        if os.environ.get('GH_HOST', 'github.com') != 'github.com':
+            return None
+        # http.client ignores HTTPS_PROXY/NO_PROXY; behind a proxy a direct connection
+        # would only time out, so leave the requests to gh, which honours them
+        import urllib.request
+        if urllib.request.getproxies().get('https') and not urllib.request.proxy_bypass(cls.API_HOST):
+            return None
+        try:
+            result = subprocess.run(['gh', 'auth', 'token'], capture_output=True, text=True, check=True)
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        token = result.stdout.strip()
+        return cls(token) if token else None
+    
+    def request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None,
+                idempotent: Optional[bool] = None) -> Any:
+        """Send a request and return the decoded JSON response body"""
+        status, _, raw = self._send(method, path, payload, idempotent=idempotent)
+        data = _json_loads(raw) if raw else None
+        if status >= 400:
+            message = data.get('message', '') if isinstance(data, dict) else raw.decode('utf-8', 'replace')
+            raise GitHubAPIError(status, message)
+        return data
+    
+    def conditional_get(self, path: str, etag: Optional[str]) -> Tuple[int, Optional[str], bytes]:
+        """GET with If-None-Match; returns (status, etag, body). 304 responses are free against the rate limit."""
+        status, headers, raw = self._send("GET", path, None, {"If-None-Match": etag} if etag else None)
+        if status >= 400:
+            raise GitHubAPIError(status, raw.decode('utf-8', 'replace'))
+        return status, headers.get('ETag'), raw
+    
+    def _send(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None,
+              extra_headers: Optional[Dict[str, str]] = None,
+              idempotent: Optional[bool] = None) -> Tuple[int, Any, bytes]:
+        """
+        Send a request over the shared connection; returns (status, headers, raw body).
+        Only idempotent requests (GET by default) are resent once the request may have
+        reached the server, so a dropped connection can never double-post a comment.
+        """
+        if idempotent is None:
+            idempotent = method == "GET"
+        body = _json_dumps(payload) if payload is not None else None
+        headers = {
+            "Authorization": f"Bearer {self.token}",
+            "Accept": "application/vnd.github+json",
+            "User-Agent": "presto-pr",
+        }
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+        if extra_headers:
+            headers.update(extra_headers)
+        
+        reused = self._conn is not None
+        if not reused:
+            self._conn = http.client.HTTPSConnection(self.API_HOST, timeout=30)
+        try:
+            self._conn.request(method, path, body=body, headers=headers)
+        except (OSError, http.client.HTTPException) as e:
+            self.close()
+            # An idle keep-alive connection was closed before the server read the request
+            if reused and isinstance(e, (BrokenPipeError, ConnectionResetError)):
+                return self._send(method, path, payload, extra_headers, idempotent)
+            raise RequestNotSentError(f"Could not send request to {self.API_HOST}: {e!r}") from e
+        
+        try:
+            response = self._conn.getresponse()
+            raw = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            # The server may already have acted on the request; only reads are safe to resend
+            self.close()
+            if reused and idempotent and isinstance(
+                    e, (http.client.HTTPException, BrokenPipeError, ConnectionResetError)):
+                return self._send(method, path, payload, extra_headers, idempotent)
+            if isinstance(e, OSError):
+                raise
+            # Malformed or truncated responses (IncompleteRead, BadStatusLine, ...) surface as
+            # connection errors so callers fall back or report them like any other
+            raise ConnectionError(f"Bad response from {self.API_HOST}: {e!r}") from e
+        
+        return response.status, response.headers, raw
+    
+    def close(self):
+        """Close the underlying connection"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
 class PRCommentWorkflow:
     def __init__(self, repo_owner: str, repo_name: str):
         self.repo_owner = repo_owner
         self.repo_name = repo_name
         self.repo_full_name = f"{repo_owner}/{repo_name}"
+        self._http_client = None
+        self._http_client_checked = False
+        self._skip_registry_cache: Dict[str, set] = {}
+        self._progress_buf: List[str] = []
+        self._detected_session: Optional[str] = None
+        self._no_sessions_found = False
         self.current_user = self._get_current_github_user()
     
+    def _log(self, message: str) -> None:
+        """Queue a per-thread progress line; _flush_progress prints the batch"""
+        self._progress_buf.append(message)
+    
+    def _flush_progress(self) -> None:
+        """Print queued progress lines with a single stdout write"""
+        if self._progress_buf:
+            self._progress_buf.append('')
+            sys.stdout.write('\n'.join(self._progress_buf))
+            sys.stdout.flush()
+            self._progress_buf.clear()
+    
+    def _get_http_client(self) -> Optional[GitHubHTTPClient]:
+        """Lazily create the shared keep-alive API client (None when gh has no token)"""
+        if not self._http_client_checked:
+            self._http_client = GitHubHTTPClient.from_gh_cli()
+            self._http_client_checked = True
+        return self._http_client
+    
+    def _api_json(self, method: str, path: str, payload: Optional[Dict[str, Any]], gh_cmd: List[str],
+                  idempotent: Optional[bool] = None) -> Any:
+        """Call the GitHub API over the keep-alive client, falling back to the given gh command"""
+        client = self._get_http_client()
+        if client is not None:
+            if idempotent is None:
+                idempotent = method == "GET"
+            try:
+                return client.request(method, path, payload, idempotent)
+            except OSError as e:
+                # Direct connections can fail where gh works (gh honours HTTPS_PROXY/NO_PROXY);
+                # switch to gh for the rest of the session, unless a write may already have landed
+                if not (idempotent or isinstance(e, RequestNotSentError)):
+                    raise
+                print(f"⚠️  Direct GitHub connection failed ({e}); falling back to gh")
+                client.close()
+                self._http_client = None
+        result = subprocess.run(gh_cmd, capture_output=True, text=True, check=True)
+        return _json_loads(result.stdout)
+    
     def _get_current_github_user(self) -> str:
-        """Get the current GitHub user from gh CLI"""
+        """Get the current GitHub user, using the on-disk cache when it is fresh"""
+        cached_user = _read_cached_github_user()
+        if cached_user:
+            print(f"🔍 Current GitHub user: {cached_user}")
+            return cached_user
         try:
-            result = subprocess.run(['gh', 'api', 'user'], capture_output=True, text=True, check=True)
-            user_data = json.loads(result.stdout)
+            user_data = self._api_json("GET", "/user", None, ['gh', 'api', 'user'])
             username = user_data.get('login', 'unknown')
+            if username != 'unknown':
+                _write_cached_github_user(username)
             print(f"🔍 Current GitHub user: {username}")
             return username
-        except (subprocess.CalledProcessError, json.JSONDecodeError) as e:
+        except (subprocess.CalledProcessError, json.JSONDecodeError, GitHubAPIError, OSError) as e:
             print(f"⚠️  Could not determine current GitHub user: {e}")
             return 'unknown'
     
@@ -170,11 +703,14 @@ class PRCommentWorkflow:
         Check if a thread should be skipped based on skip criteria
         Returns dict with skip decision and reason
         """
-        main_comment = thread_data['main']
-        replies = thread_data.get('replies', [])
+        # GitHub's own resolved flag (GraphQL) is authoritative; the keyword
+        # heuristic is only needed when the data came from the REST API
+        is_resolved = thread_data.get('metadata', {}).get('is_resolved')
+        if is_resolved is None:
+            is_resolved = self._is_thread_resolved(thread_data)
         
         # Check if thread is resolved/closed
-        if self._is_thread_resolved(thread_data):
+        if is_resolved:
             return {
                 'skip': True,
                 'reason': 'Thread is marked as resolved/closed',
@@ -196,26 +732,14 @@ class PRCommentWorkflow:
         }
     
     def _is_thread_resolved(self, thread_data: Dict[str, Any]) -> bool:
-        """Check if thread appears to be resolved/closed"""
+        """Check if thread appears to be resolved/closed (keyword heuristic for REST data)"""
         main_comment = thread_data['main']
         replies = thread_data.get('replies', [])
-        all_comments = [main_comment] + replies
-        
-        # Check for resolution keywords in any comment
-        resolution_keywords = [
-            'resolved', 'fixed', 'closed', 'done', 'completed',
-            'merged', 'addressed', 'solved', 'finished'
-        ]
         
-        for comment in all_comments:
-            body = comment.get('body', '').lower()
-            # Look for explicit resolution statements
-            if any(keyword in body for keyword in resolution_keywords):
-                if any(phrase in body for phrase in [
-                    'this is resolved', 'marking as resolved', 'resolved in',
-                    'fixed in', 'closed by', 'done in', 'completed in'
-                ]):
-                    return True
+        # Look for explicit resolution statements (one scan per body, stop at first hit)
+        for comment in chain((main_comment,), replies):
+            if RESOLUTION_PHRASE_RE.search(comment.get('body', '')):
+                return True
         
         return False
     
@@ -229,36 +753,234 @@ class PRCommentWorkflow:
         
         # If no replies, check if user made the main comment
         if not replies:
-            main_author = main_comment.get('user', {}).get('login', main_comment.get('author', {}).get('login', ''))
-            return main_author == self.current_user
+            return _author_of(main_comment) == self.current_user
+        
+        # Replies are kept sorted by timestamp, so the last one is the most recent
+        return _author_of(replies[-1]) == self.current_user
+    
+    def fetch_pr_comments(self, pr_number: int, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Fetch PR details and comments using gh CLI (GraphQL first, REST fallback).
+        Results are cached on disk for PR_CACHE_TTL and revalidated with the ETags of
+        the comment lists, so re-running commands against an unchanged PR skips the
+        comment fetch entirely. Validators are only collected on a repeat run within
+        the TTL, so a one-off fetch costs no extra requests.
+        """
+        cache_path = self._get_pr_cache_path(pr_number)
+        cached = None if refresh else self._load_pr_cache(cache_path)
         
-        # Sort replies by timestamp to find the most recent
-        sorted_replies = sorted(replies, key=lambda x: x.get('created_at', ''))
-        last_reply = sorted_replies[-1]
-        last_author = last_reply.get('user', {}).get('login', '')
+        # What to record after this fetch: {} marks the PR as recently fetched (the next run
+        # collects ETags), None means a list spans several pages and can't be revalidated
+        store_etags = {} if cached is None else False
+        if cached is not None and cached['etags'] is not None:
+            try:
+                unchanged, store_etags = self._check_comment_etags(pr_number, cached['etags'])
+                if unchanged:
+                    age = int(time.time() - cached['fetched_at'])
+                    print(f"♻️  Comments unchanged since last fetch ({age}s ago), using cached data (--refresh to force)")
+                    self._normalize_comments(cached['pr_data'])
+                    return cached['pr_data']
+            except (subprocess.CalledProcessError, GitHubAPIError, OSError, ValueError) as e:
+                print(f"⚠️  Could not revalidate comment cache: {e}")
+                store_etags = False
         
-        return last_author == self.current_user
+        try:
+            pr_data = self._fetch_via_graphql(pr_number)
+        except (subprocess.CalledProcessError, GitHubAPIError, OSError, KeyError, TypeError, ValueError) as e:
+            detail = e.stderr.strip() if isinstance(e, subprocess.CalledProcessError) and e.stderr else e
+            print(f"⚠️  GraphQL fetch failed ({detail}), falling back to REST API")
+            pr_data = self._fetch_via_rest(pr_number)
+        
+        if pr_data:
+            self._normalize_comments(pr_data)
+            if store_etags is not False:
+                entry = {'etags': store_etags, 'fetched_at': time.time()}
+                if store_etags:
+                    entry['pr_data'] = pr_data
+                try:
+                    _write_json_atomic(cache_path, entry)
+                except OSError as e:
+                    print(f"⚠️  Could not write comment cache: {e}")
+        return pr_data
+    
+    def _get_pr_cache_path(self, pr_number: int) -> str:
+        """Return path of the cached fetch result for this PR"""
+        return os.path.join(CACHE_DIR, self.repo_owner, self.repo_name, f"{pr_number}.json")
     
-    def fetch_pr_comments(self, pr_number: int) -> Dict[str, Any]:
-        """Fetch PR details and comments using gh CLI"""
+    def _load_pr_cache(self, cache_path: str) -> Optional[Dict[str, Any]]:
+        """Load a cache entry, or None if missing, unreadable or older than PR_CACHE_TTL"""
+        try:
+            cached = _read_json_file(cache_path)
+            etags = cached['etags']
+            if etags is not None and not isinstance(etags, dict):
+                return None
+            if etags and not cached.get('pr_data'):
+                return None
+            if time.time() - cached['fetched_at'] <= PR_CACHE_TTL:
+                return cached
+        except (OSError, ValueError, AttributeError, KeyError, TypeError):
+            pass
+        return None
+    
+    def _check_comment_etags(self, pr_number: int, etags: Dict[str, str]) -> Tuple[bool, Optional[Dict[str, str]]]:
+        """
+        Conditionally GET the review and general comment lists. Returns (unchanged, etags),
+        where unchanged means every list answered 304 to its cached ETag. An ETag only covers
+        the page it came from, so when a list fills a whole page the etags are None.
+        """
+        unchanged = bool(etags)
+        new_etags = {}
+        for path in (f"/repos/{self.repo_full_name}/pulls/{pr_number}/comments",
+                     f"/repos/{self.repo_full_name}/issues/{pr_number}/comments"):
+            status, etag, body = self._conditional_get(f"{path}?per_page={COMMENT_PAGE_SIZE}", etags.get(path))
+            if status != 304:
+                unchanged = False
+                # A new comment always changes a page that isn't full yet; a full page may not
+                items = _json_loads(body) if body else None
+                if not isinstance(items, list) or len(items) >= COMMENT_PAGE_SIZE:
+                    return False, None
+            if not etag:
+                return False, None
+            new_etags[path] = etag
+        return unchanged, new_etags
+    
+    def _conditional_get(self, path: str, etag: Optional[str]) -> Tuple[int, Optional[str], Any]:
+        """GET with If-None-Match over the keep-alive client, or through gh; returns (status, etag, body)"""
+        client = self._get_http_client()
+        if client is not None:
+            try:
+                return client.conditional_get(path, etag)
+            except OSError as e:
+                # Same fallback as _api_json: gh may reach GitHub where a direct connection can't
+                print(f"⚠️  Direct GitHub connection failed ({e}); falling back to gh")
+                client.close()
+                self._http_client = None
+        
+        cmd = ["gh", "api", "-i", path.lstrip('/')]
+        if etag:
+            cmd += ["-H", f"If-None-Match: {etag}"]
+        # gh exits non-zero on 304 but still prints the response head with -i
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        head, _, body = result.stdout.partition('\n\n')
+        head = head.splitlines()
+        if not head or not head[0].startswith('HTTP/'):
+            raise subprocess.CalledProcessError(result.returncode, cmd, result.stdout, result.stderr)
+        status = int(head[0].split()[1])
+        if status >= 400:
+            raise subprocess.CalledProcessError(result.returncode, cmd, result.stdout, result.stderr)
+        new_etag = None
+        for line in head[1:]:
+            name, _, value = line.partition(':')
+            if name.strip().lower() == 'etag':
+                new_etag = value.strip()
+        return status, new_etag, body
+    
+    def _normalize_comments(self, pr_data: Dict[str, Any]) -> None:
+        """
+        Pass over the comments so hot paths can read fields directly. It is idempotent,
+        so entry points also run it on pr_data that did not come from fetch_pr_comments.
+        GitHub may return null bodies; store '' so search/resolution checks never see None.
+        Author and timestamp live under different keys for general (gh pr view) and
+        review (REST) comments; expose both as '_author' / '_created'.
+        """
+        for comment in chain(pr_data.get('comments', []), pr_data.get('review_comments', [])):
+            _normalize_comment(comment)
+    
+    def _fetch_via_graphql(self, pr_number: int) -> Dict[str, Any]:
+        """Fetch PR details, general comments and review comments in one GraphQL call"""
+        cmd = [
+            "gh", "api", "graphql",
+            "-f", f"query={PR_COMMENTS_QUERY}",
+            "-f", f"owner={self.repo_owner}",
+            "-f", f"repo={self.repo_name}",
+            "-F", f"pr={pr_number}"
+        ]
+        payload = {
+            "query": PR_COMMENTS_QUERY,
+            "variables": {"owner": self.repo_owner, "repo": self.repo_name, "pr": pr_number}
+        }
+        
+        # A GraphQL query only reads, so it is safe to resend
+        response = self._api_json("POST", "/graphql", payload, cmd, idempotent=True)
+        if response.get('errors'):
+            raise ValueError(response['errors'][0].get('message', 'unknown GraphQL error'))
+        
+        pr = response['data']['repository']['pullRequest']
+        if pr is None:
+            raise ValueError(f"PR #{pr_number} not found")
+        
+        # Anything beyond the first page is left to the paginated REST path
+        review_threads = pr['reviewThreads']
+        if pr['comments']['pageInfo']['hasNextPage'] or review_threads['pageInfo']['hasNextPage']:
+            raise ValueError("PR has more comments than a single GraphQL page")
+        
+        comments = [{
+            "id": node['id'],
+            "author": node.get('author') or {},
+            "body": node.get('body', ''),
+            "createdAt": node.get('createdAt', '')
+        } for node in pr['comments']['nodes']]
+        
+        # Shape review threads into the REST contract: replies point at the thread's first comment
+        review_comments = []
+        for thread in review_threads['nodes']:
+            thread_comments = thread['comments']
+            if thread_comments['pageInfo']['hasNextPage']:
+                raise ValueError("Review thread has more comments than a single GraphQL page")
+            root_id = None
+            for node in thread_comments['nodes']:
+                if root_id is None:
+                    root_id = node['databaseId'] if node.get('replyTo') is None else node['replyTo']['databaseId']
+                review_comments.append({
+                    "id": node['databaseId'],
+                    "user": node.get('author') or {},
+                    "body": node.get('body', ''),
+                    "created_at": node.get('createdAt', ''),
+                    "path": node.get('path'),
+                    "line": node.get('line'),
+                    "in_reply_to_id": None if node['databaseId'] == root_id else root_id,
+                    "is_resolved": thread.get('isResolved')
+                })
+        
+        return {
+            "pr_number": pr_number,
+            "title": pr.get("title", ""),
+            "author": (pr.get("author") or {}).get("login", ""),
+            "body": pr.get("body", ""),
+            "created_at": pr.get("createdAt", ""),
+            "state": pr.get("state", ""),
+            "comments": comments,
+            "review_comments": review_comments
+        }
+    
+    def _fetch_via_rest(self, pr_number: int) -> Dict[str, Any]:
+        """Fetch PR details and comments using gh pr view + the REST comments endpoint"""
         try:
             # Get PR details and general comments
             pr_cmd = [
                 "gh", "pr", "view", str(pr_number),
                 "--repo", self.repo_full_name,
-                "--json", "title,author,body,createdAt,state,comments"
+                "--json", "title,author,body,createdAt,state,comments",
+                "--jq", PR_VIEW_JQ
             ]
             
-            result = subprocess.run(pr_cmd, capture_output=True, text=True, check=True)
-            pr_data = json.loads(result.stdout)
-            
-            # Get review comments (inline code comments)  
+            # Get review comments (inline code comments), one projected object per comment
             review_cmd = [
-                "gh", "api", f"repos/{self.repo_full_name}/pulls/{pr_number}/comments", "--paginate"
+                "gh", "api", f"repos/{self.repo_full_name}/pulls/{pr_number}/comments", "--paginate",
+                "--jq", REVIEW_COMMENTS_JQ
             ]
             
-            review_result = subprocess.run(review_cmd, capture_output=True, text=True, check=True)
-            review_comments = json.loads(review_result.stdout)
+            # The two requests are independent, so run them concurrently
+            def run_cmd(cmd):
+                return subprocess.run(cmd, capture_output=True, text=True, check=True)
+            
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                pr_future = executor.submit(run_cmd, pr_cmd)
+                review_future = executor.submit(self._stream_json_command, review_cmd)
+                result = pr_future.result()
+                review_comments = review_future.result()
+            
+            pr_data = _json_loads(result.stdout)
             
             return {
                 "pr_number": pr_number,
@@ -278,30 +1000,44 @@ class PRCommentWorkflow:
             print(f"Error parsing JSON response: {e}")
             return None
     
+    def _stream_json_command(self, cmd: List[str]) -> List[Any]:
+        """
+        Run a gh command and decode its JSON output while it is still paginating,
+        instead of buffering every page in stdout and parsing it in one go.
+        """
+        with tempfile.TemporaryFile(mode='w+') as err:
+            with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=err, text=True) as proc:
+                values = list(_iter_json_values(proc.stdout))
+            if proc.returncode:
+                err.seek(0)
+                raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=err.read())
+        return values
+    
     def find_comment_by_text(self, pr_data: Dict[str, Any], search_text: str) -> List[Dict[str, Any]]:
         """Find comments containing specific text"""
         matches = []
+        pattern = _compile_search_pattern(search_text)
         
         # Search general comments
         for comment in pr_data.get('comments', []):
-            if search_text.lower() in comment.get('body', '').lower():
+            if pattern.search(comment.get('body') or ''):
                 matches.append({
                     'type': 'general',
                     'id': comment.get('id'),
-                    'author': comment.get('author', {}).get('login', 'Unknown'),
-                    'created_at': comment.get('createdAt', 'Unknown'),
+                    'author': _author_of(comment) or 'Unknown',
+                    'created_at': _created_at(comment) or 'Unknown',
                     'body': comment.get('body', ''),
                     'comment_data': comment
                 })
         
         # Search review comments
         for comment in pr_data.get('review_comments', []):
-            if search_text.lower() in comment.get('body', '').lower():
+            if pattern.search(comment.get('body') or ''):
                 matches.append({
                     'type': 'review',
                     'id': comment.get('id'),
-                    'author': comment.get('user', {}).get('login', 'Unknown'),
-                    'created_at': comment.get('created_at', 'Unknown'),
+                    'author': _author_of(comment) or 'Unknown',
+                    'created_at': _created_at(comment) or 'Unknown',
                     'path': comment.get('path', 'Unknown'),
                     'line': comment.get('line'),
                     'body': comment.get('body', ''),
@@ -317,20 +1053,26 @@ class PRCommentWorkflow:
             if comment_type == "review":
                 # Reply to a review comment (inline code comment)
                 # Use the exact same format as the successful manual command
+                path = f"/repos/{self.repo_full_name}/pulls/{pr_number}/comments"
+                payload = {
+                    "body": reply_body,
+                    "in_reply_to": int(comment_id) if str(comment_id).isdigit() else comment_id
+                }
                 cmd = [
-                    "gh", "api", f"repos/{self.repo_full_name}/pulls/{pr_number}/comments",
+                    "gh", "api", path.lstrip('/'),
                     "-f", f"body={reply_body}",
                     "--field", f"in_reply_to={comment_id}"
                 ]
             else:
                 # Reply to a general PR comment
+                path = f"/repos/{self.repo_full_name}/issues/{pr_number}/comments"
+                payload = {"body": reply_body}
                 cmd = [
-                    "gh", "api", f"repos/{self.repo_full_name}/issues/{pr_number}/comments",
+                    "gh", "api", path.lstrip('/'),
                     "-f", f"body={reply_body}"
                 ]
             
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            response = json.loads(result.stdout)
+            response = self._api_json("POST", path, payload, cmd)
             
             print(f"✅ Successfully replied to comment {comment_id}")
             print(f"📍 Reply URL: {response.get('html_url', 'N/A')}")
@@ -339,6 +1081,9 @@ class PRCommentWorkflow:
         except subprocess.CalledProcessError as e:
             print(f"❌ Error replying to comment: {e.stderr}")
             return False
+        except (GitHubAPIError, OSError) as e:
+            print(f"❌ Error replying to comment: {e}")
+            return False
         except json.JSONDecodeError as e:
             print(f"❌ Error parsing response: {e}")
             return False
@@ -351,9 +1096,9 @@ class PRCommentWorkflow:
                 return {
                     'type': 'general',
                     'comment_data': comment,
-                    'author': comment.get('author', {}).get('login', 'Unknown'),
+                    'author': _author_of(comment) or 'Unknown',
                     'body': comment.get('body', ''),
-                    'created_at': comment.get('createdAt', 'Unknown')
+                    'created_at': _created_at(comment) or 'Unknown'
                 }
         
         # Check review comments  
@@ -362,9 +1107,9 @@ class PRCommentWorkflow:
                 return {
                     'type': 'review',
                     'comment_data': comment,
-                    'author': comment.get('user', {}).get('login', 'Unknown'),
+                    'author': _author_of(comment) or 'Unknown',
                     'body': comment.get('body', ''),
-                    'created_at': comment.get('created_at', 'Unknown'),
+                    'created_at': _created_at(comment) or 'Unknown',
                     'path': comment.get('path', 'Unknown'),
                     'line': comment.get('line')
                 }
@@ -373,138 +1118,116 @@ class PRCommentWorkflow:
     
     def format_comments(self, pr_data: Dict[str, Any]) -> str:
         """Format comments for easy reading and analysis"""
-        output = []
+        return ''.join(self.iter_format_comments(pr_data))
+    
+    def iter_format_comments(self, pr_data: Dict[str, Any]) -> Iterator[str]:
+        """Yield the formatted comment report chunk by chunk"""
+        self._normalize_comments(pr_data)
         
         # PR Header
-        output.append(f"# PR #{pr_data['pr_number']}: {pr_data['title']}")
-        output.append(f"**Author**: {pr_data['author']}")
-        output.append(f"**Created**: {pr_data['created_at']}")
-        output.append(f"**State**: {pr_data['state']}")
-        output.append("")
+        yield f"# PR #{pr_data['pr_number']}: {pr_data['title']}\n"
+        yield f"**Author**: {pr_data['author']}\n"
+        yield f"**Created**: {pr_data['created_at']}\n"
+        yield f"**State**: {pr_data['state']}\n"
+        yield "\n"
         
         # PR Description
         if pr_data['body']:
-            output.append("## PR Description")
-            output.append(pr_data['body'])
-            output.append("")
+            yield "## PR Description\n"
+            yield pr_data['body']
+            yield "\n\n"
         
         # General Comments with IDs
         comments = pr_data.get('comments', [])
         if comments:
-            output.append("## General Comments")
+            yield "## General Comments\n"
             for i, comment in enumerate(comments, 1):
-                output.append(f"### Comment {i} - ID: {comment.get('id', 'Unknown')}")
-                output.append(f"**Author**: {comment.get('author', {}).get('login', 'Unknown')}")
-                output.append(f"**Created**: {comment.get('createdAt', 'Unknown')}")
-                output.append("")
-                output.append(comment.get('body', ''))
-                output.append("")
+                yield f"### Comment {i} - ID: {comment.get('id', 'Unknown')}\n"
+                yield f"**Author**: {comment['_author'] or 'Unknown'}\n"
+                yield f"**Created**: {comment['_created'] or 'Unknown'}\n"
+                yield "\n"
+                yield comment.get('body', '')
+                yield "\n\n"
         else:
-            output.append("## General Comments")
-            output.append("*No general comments found on this PR.*")
-            output.append("")
+            yield "## General Comments\n"
+            yield "*No general comments found on this PR.*\n"
+            yield "\n"
         
         # Review Comments (Inline Code Comments) - Threaded with IDs
         review_comments = pr_data.get('review_comments', [])
         if review_comments:
-            output.append("## Review Comments (Inline) - Threaded")
-            output.extend(self._format_threaded_comments(review_comments))
+            yield "## Review Comments (Inline) - Threaded\n"
+            yield from self._iter_threaded_comments(review_comments)
         else:
-            output.append("## Review Comments (Inline)")
-            output.append("*No review comments found on this PR.*")
-            output.append("")
+            yield "## Review Comments (Inline)\n"
+            yield "*No review comments found on this PR.*\n"
+            yield "\n"
         
         # Comment ID Summary
-        output.append("## Comment ID Summary")
-        output.append("### General Comment IDs:")
+        yield "## Comment ID Summary\n"
+        yield "### General Comment IDs:\n"
         for i, comment in enumerate(comments, 1):
-            output.append(f"- Comment {i}: {comment.get('id', 'Unknown')} by {comment.get('author', {}).get('login', 'Unknown')}")
+            yield f"- Comment {i}: {comment.get('id', 'Unknown')} by {comment['_author'] or 'Unknown'}\n"
         
-        output.append("### Review Comment IDs:")
+        yield "### Review Comment IDs:\n"
         for i, comment in enumerate(review_comments, 1):
-            output.append(f"- Review Comment {i}: {comment.get('id', 'Unknown')} by {comment.get('user', {}).get('login', 'Unknown')} " +
-                         f"(File: {comment.get('path', 'Unknown')}, Line: {comment.get('line', 'N/A')})")
-        output.append("")
-        
-        return "\n".join(output)
+            yield (f"- Review Comment {i}: {comment.get('id', 'Unknown')} by {comment['_author'] or 'Unknown'} " +
+                  f"(File: {comment.get('path', 'Unknown')}, Line: {comment.get('line', 'N/A')})\n")
     
-    def _format_threaded_comments(self, comments: List[Dict]) -> List[str]:
-        """Format comments in threaded conversations with IDs"""
-        output = []
-        
-        # Build comment lookup map
-        comment_map = {comment['id']: comment for comment in comments}
-        
-        # Group into threads (top-level comments and their replies)
-        threads = {}
-        for comment in comments:
-            if comment.get('in_reply_to_id') is None:
-                # Top-level comment
-                threads[comment['id']] = {
-                    'main': comment,
-                    'replies': []
-                }
-            else:
-                # Reply to another comment
-                parent_id = comment['in_reply_to_id']
-                if parent_id in threads:
-                    threads[parent_id]['replies'].append(comment)
-                else:
-                    # Parent not found, treat as orphaned thread
-                    threads[comment['id']] = {
-                        'main': comment,
-                        'replies': [],
-                        'orphaned': True
-                    }
-        
-        # Sort threads by creation time of main comment
-        sorted_threads = sorted(threads.items(), 
-                               key=lambda x: x[1]['main']['created_at'])
+    def _iter_threaded_comments(self, comments: List[Dict]) -> Iterator[str]:
+        """Yield comments in threaded conversations with IDs chunk by chunk"""
+        # Group into threads (top-level comments and their replies), independent of input order
+        threads = self._build_thread_structure(comments)
         
         thread_num = 1
-        for thread_id, thread_data in sorted_threads:
+        for _, thread_id, thread_data in self._sort_threads(threads):
             main_comment = thread_data['main']
-            replies = sorted(thread_data['replies'], key=lambda x: x['created_at'])
+            replies = thread_data['replies']
             
             # Thread header
-            output.append(f"### 🧵 Thread {thread_num}")
+            yield f"### 🧵 Thread {thread_num}\n"
             if thread_data.get('orphaned'):
-                output.append("*(Reply to missing comment)*")
-            output.append("")
+                yield "*(Reply to missing comment)*\n"
+            yield "\n"
             
             # Main comment with ID
-            output.append(f"**💬 {main_comment.get('user', {}).get('login', 'Unknown')}** - *{main_comment.get('created_at', 'Unknown')}*")
-            output.append(f"📁 **File**: `{main_comment.get('path', 'Unknown')}`" + 
-                         (f" **Line**: {main_comment.get('line')}" if main_comment.get('line') else ""))
-            output.append(f"🆔 **Comment ID**: {main_comment.get('id', 'Unknown')}")
-            output.append("")
-            output.append(main_comment.get('body', ''))
-            output.append("")
+            yield f"**💬 {main_comment['_author'] or 'Unknown'}** - *{main_comment['_created'] or 'Unknown'}*\n"
+            yield (f"📁 **File**: `{main_comment.get('path', 'Unknown')}`" + 
+                  (f" **Line**: {main_comment.get('line')}" if main_comment.get('line') else "") + "\n")
+            yield f"🆔 **Comment ID**: {main_comment.get('id', 'Unknown')}\n"
+            yield "\n"
+            yield main_comment.get('body', '')
+            yield "\n\n"
             
             # Replies with IDs
             for reply in replies:
-                output.append(f"  ↳ **{reply.get('user', {}).get('login', 'Unknown')}** - *{reply.get('created_at', 'Unknown')}*")
-                output.append(f"    🆔 **Reply ID**: {reply.get('id', 'Unknown')}")
+                yield f"  ↳ **{reply['_author'] or 'Unknown'}** - *{reply['_created'] or 'Unknown'}*\n"
+                yield f"    🆔 **Reply ID**: {reply.get('id', 'Unknown')}\n"
                 # Indent reply body
                 reply_body = reply.get('body', '')
                 for line in reply_body.split('\n'):
-                    output.append(f"    {line}")
-                output.append("")
+                    yield f"    {line}\n"
+                yield "\n"
             
-            output.append("---")
-            output.append("")
+            yield "---\n"
+            yield "\n"
             thread_num += 1
-        
-        return output
     
-    def save_to_file(self, content: str, filename: str = None):
-        """Save formatted content to a file"""
+    def _default_output_filename(self) -> str:
+        """Return a timestamped filename for saved comment reports"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return f"pr_comments_{timestamp}.md"
+    
+    def save_to_file(self, content: Iterable[str], filename: str = None):
+        """Save formatted content (a string or an iterable of chunks) to a file"""
         if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"pr_comments_{timestamp}.md"
+            filename = self._default_output_filename()
         
         with open(filename, 'w', encoding='utf-8') as f:
-            f.write(content)
+            if isinstance(content, str):
+                f.write(content)
+            else:
+                f.writelines(content)
         
         print(f"Comments saved to: {filename}")
         return filename
@@ -582,26 +1305,73 @@ class PRCommentWorkflow:
             workflow.append_response_to_thread("pr_123_review_20240101_120000", 3, "I agree with your architectural concern.")
             workflow.append_response_to_thread("pr_123_review_20240101_120000", 3, "Let me propose an alternative approach...")
         """
-        try:
-            # Find the thread file
-            thread_files = [f for f in os.listdir(session_dir) if f.startswith(f"thread_{thread_number:02d}_")]
-            
-            if not thread_files:
-                print(f"❌ Thread {thread_number} not found in {session_dir}")
-                return False
-            
-            if len(thread_files) > 1:
-                print(f"⚠️  Multiple files found for thread {thread_number}, using first: {thread_files[0]}")
-            
-            thread_file = os.path.join(session_dir, thread_files[0])
+        return self.append_responses_batch(session_dir, [(thread_number, response_content, author)])
+    
+    def append_responses_batch(self, session_dir: str, items: List[Tuple[int, str, str]]) -> bool:
+        """
+        Append several draft responses, opening each target thread file only once.
+        
+        Args:
+            session_dir: The session directory (e.g., "pr_123_review_20240101_120000")
+            items: (thread_number, response_content, author) tuples, appended in order
             
-            # Check if this is a skipped thread
-            if "SKIP_" in thread_files[0]:
-                print(f"⚠️  Warning: Thread {thread_number} is marked as SKIP. Adding response anyway.")
+        Returns:
+            bool: True if every response was appended, False otherwise
             
-            # Prepare response section
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            response_section = f"""
+        Usage Example:
+            workflow.append_responses_batch("pr_123_review_20240101_120000", [
+                (3, "I agree with your architectural concern.", "AI Assistant"),
+                (3, "Let me propose an alternative approach...", "AI Assistant"),
+                (4, "Fixed in the latest commit.", "AI Assistant"),
+            ])
+        """
+        # Group by thread, keeping each thread's responses in submission order
+        by_thread: Dict[int, List[Tuple[str, str]]] = {}
+        for thread_number, response_content, author in items:
+            by_thread.setdefault(thread_number, []).append((response_content, author))
+        
+        # One wall-clock stamp for the whole batch
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+        
+        all_appended = True
+        for thread_number, responses in by_thread.items():
+            try:
+                # Find the thread file
+                thread_files = self._find_thread_files(session_dir, thread_number)
+                
+                if not thread_files:
+                    print(f"❌ Thread {thread_number} not found in {session_dir}")
+                    all_appended = False
+                    continue
+                
+                if len(thread_files) > 1:
+                    print(f"⚠️  Multiple files found for thread {thread_number}, using first: {thread_files[0]}")
+                
+                thread_file = os.path.join(session_dir, thread_files[0])
+                
+                # Check if this is a skipped thread
+                if "SKIP_" in thread_files[0]:
+                    print(f"⚠️  Warning: Thread {thread_number} is marked as SKIP. Adding response anyway.")
+                
+                # Append every response for this thread through one buffered handle
+                with open(thread_file, 'a', encoding='utf-8', buffering=io.DEFAULT_BUFFER_SIZE) as f:
+                    for response_content, author in responses:
+                        f.write(self._format_draft_section(response_content, author, timestamp))
+                
+                if len(responses) == 1:
+                    print(f"✅ Response appended to thread {thread_number} ({thread_files[0]})")
+                else:
+                    print(f"✅ {len(responses)} responses appended to thread {thread_number} ({thread_files[0]})")
+                
+            except Exception as e:
+                print(f"❌ Error appending response to thread {thread_number}: {e}")
+                all_appended = False
+        
+        return all_appended
+    
+    def _format_draft_section(self, response_content: str, author: str, timestamp: str) -> str:
+        """Build the DRAFT RESPONSE section appended to thread files"""
+        return f"""
 
 ---
 
@@ -613,18 +1383,45 @@ class PRCommentWorkflow:
 
 ---
 """
-            
-            # Append to file
-            with open(thread_file, 'a', encoding='utf-8') as f:
-                f.write(response_section)
-            
-            print(f"✅ Response appended to thread {thread_number} ({thread_files[0]})")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Error appending response to thread {thread_number}: {e}")
-            return False
 
+    def _load_session_manifest(self, session_dir: str) -> Dict[str, str]:
+        """Load (and cache for this process) the session's thread manifest; {} if absent"""
+        manifest = _session_manifests.get(session_dir)
+        if manifest is None:
+            try:
+                manifest = _read_json_file(os.path.join(session_dir, SESSION_MANIFEST))
+            except (OSError, ValueError):
+                return {}
+            _session_manifests[session_dir] = manifest
+        return manifest
+    
+    def _find_thread_files(self, session_dir: str, thread_number: int) -> List[str]:
+        """Return filenames for a thread number, via the manifest when possible"""
+        filename = self._load_session_manifest(session_dir).get(str(thread_number))
+        if filename and os.path.isfile(os.path.join(session_dir, filename)):
+            return [filename]
+        # Sessions created before manifests existed (or edited by hand): scan the directory.
+        # Thread numbers are unique, so stop once a second match proves there are duplicates.
+        prefix = f"thread_{thread_number:02d}_"
+        matches = []
+        with os.scandir(session_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith(prefix):
+                    matches.append(entry.name)
+                    if len(matches) > 1:
+                        break
+        return matches
+    
+    def _scan_thread_files(self, session_dir: str) -> List[os.DirEntry]:
+        """Return the session's thread_*.md entries sorted by name, scanning the directory once"""
+        entries = _session_thread_entries.get(session_dir)
+        if entries is None:
+            with os.scandir(session_dir) as it:
+                entries = [e for e in it if e.name.startswith("thread_") and e.name.endswith(".md") and e.is_file()]
+            entries.sort(key=lambda e: e.name)
+            _session_thread_entries[session_dir] = entries
+        return entries
+    
     def extract_and_organize_threads(self, pr_data: Dict[str, Any]) -> str:
         """
         PHASE 1: THREAD EXTRACTION & ORGANIZATION
@@ -633,12 +1430,16 @@ class PRCommentWorkflow:
         - Write each thread to separate file with proper naming
         - Include all metadata and threading structure
         """
+        self._normalize_comments(pr_data)
         pr_number = pr_data['pr_number']
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         session_dir = f"pr_{pr_number}_review_{timestamp}"
         
         print(f"📁 Creating review session directory: {session_dir}")
         os.makedirs(session_dir, exist_ok=True)
+        # This is now the most recent session, so later auto-detection can skip the scan
+        self._detected_session = session_dir
+        self._no_sessions_found = False
         
         # Extract all comments and organize into threads
         comments = pr_data.get('comments', [])
@@ -675,29 +1476,30 @@ class PRCommentWorkflow:
                 skip_stats['skipped'] += 1
                 skip_type = skip_decision['skip_type']
                 skip_stats['skip_reasons'][skip_type] = skip_stats['skip_reasons'].get(skip_type, 0) + 1
-                print(f"⏭️  Skipping thread: {skip_decision['reason']}")
+                self._log(f"⏭️  Skipping thread: {skip_decision['reason']}")
             else:
                 thread_data['metadata']['status'] = 'needs_response'
                 skip_stats['needs_response'] += 1
         
+        self._flush_progress()
         print(f"📋 Skip Analysis: {skip_stats['skipped']} skipped, {skip_stats['needs_response']} need responses")
         
-        # Write threads to separate files
+        # Render every thread first, then write the whole batch in one go
+        pending_writes = []
         thread_files = []
+        manifest = {}
         thread_num = 1
         
-        # Sort threads by creation time
-        sorted_threads = sorted(threads.items(), 
-                               key=lambda x: x[1]['main'].get('created_at', x[1]['main'].get('createdAt', '')))
+        # Sort threads by creation time once; the summary reuses the same order
+        sorted_threads = self._sort_threads(threads)
         
-        for thread_id, thread_data in sorted_threads:
+        for _, thread_id, thread_data in sorted_threads:
             main_comment = thread_data['main']
             
             # Generate filename with author and topic
-            author = main_comment.get('user', {}).get('login', main_comment.get('author', {}).get('login', 'unknown'))
+            author = main_comment['_author'] or 'unknown'
             body = main_comment.get('body', '')
-            topic = body.split('\n')[0][:30].replace(' ', '_').replace('/', '_').replace('\\', '_')
-            topic = ''.join(c for c in topic if c.isalnum() or c in ['_', '-'])
+            topic = _TOPIC_UNSAFE_RE.sub('', body.partition('\n')[0][:30].translate(_TOPIC_SEPARATORS))
             
             # Add skip status to filename for easy identification
             skip_prefix = "SKIP_" if thread_data['skip_decision']['skip'] else ""
@@ -706,21 +1508,25 @@ class PRCommentWorkflow:
             
             # Write thread to file
             thread_content = self._format_thread_for_file(thread_data, thread_num)
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(thread_content)
+            pending_writes.append((filepath, thread_content))
             
             thread_files.append(filepath)
+            manifest[str(thread_num)] = filename
             skip_indicator = "⏭️ " if thread_data['skip_decision']['skip'] else "💾"
-            print(f"{skip_indicator} Thread {thread_num}: {filename}")
+            self._log(f"{skip_indicator} Thread {thread_num}: {filename}")
             thread_num += 1
         
         # Create summary file
         summary_file = os.path.join(session_dir, "session_summary.md")
-        summary_content = self._create_session_summary(pr_data, threads, session_dir, skip_stats)
+        summary_content = self._create_session_summary(pr_data, threads, session_dir, skip_stats, sorted_threads)
+        pending_writes.append((summary_file, summary_content))
+        _write_text_files(pending_writes)
+        self._flush_progress()
         
-        with open(summary_file, 'w', encoding='utf-8') as f:
-            f.write(summary_content)
+        # Index thread numbers to filenames so later commands skip directory scans
+        _write_json_atomic(os.path.join(session_dir, SESSION_MANIFEST), manifest)
+        _session_manifests[session_dir] = manifest
+        _session_thread_entries.pop(session_dir, None)
         
         print(f"📋 Session summary: session_summary.md")
         print(f"✅ Phase 1 Complete: {len(threads)} threads organized in {session_dir}")
@@ -728,37 +1534,47 @@ class PRCommentWorkflow:
         return session_dir, threads, skip_stats
     
     def _build_thread_structure(self, review_comments: List[Dict]) -> Dict[str, Dict]:
-        """Build threaded structure from review comments"""
+        """Build threaded structure from review comments (independent of input order)"""
         threads = {}
-        comment_map = {comment['id']: comment for comment in review_comments}
-        
+        # Replies seen before their parent wait here until the parent shows up
+        pending = defaultdict(list)
         for comment in review_comments:
-            if comment.get('in_reply_to_id') is None:
-                # Top-level comment
+            if '_author' not in comment:
+                _normalize_comment(comment)
+            parent_id = comment.get('in_reply_to_id')
+            if parent_id is None:
                 threads[comment['id']] = {
                     'type': 'review',
                     'main': comment,
-                    'replies': [],
+                    'replies': pending.pop(comment['id'], []),
                     'metadata': {
-                        'status': 'unresolved'
+                        'status': 'unresolved',
+                        'is_resolved': comment.get('is_resolved')
                     }
                 }
+            elif parent_id in threads:
+                threads[parent_id]['replies'].append(comment)
             else:
-                # Reply to another comment
-                parent_id = comment['in_reply_to_id']
-                if parent_id in threads:
-                    threads[parent_id]['replies'].append(comment)
-                else:
-                    # Parent not found, treat as orphaned thread
-                    threads[comment['id']] = {
-                        'type': 'review',
-                        'main': comment,
-                        'replies': [],
-                        'orphaned': True,
-                        'metadata': {
-                            'status': 'unresolved'
-                        }
+                pending[parent_id].append(comment)
+        
+        # Sorted once here so consumers can rely on chronological order
+        for thread in threads.values():
+            if len(thread['replies']) > 1:
+                thread['replies'].sort(key=lambda x: x['_created'])
+        
+        for replies in pending.values():
+            # Parent not found, treat each reply as an orphaned thread
+            for comment in replies:
+                threads[comment['id']] = {
+                    'type': 'review',
+                    'main': comment,
+                    'replies': [],
+                    'orphaned': True,
+                    'metadata': {
+                        'status': 'unresolved',
+                        'is_resolved': comment.get('is_resolved')
                     }
+                }
         
         return threads
     
@@ -769,148 +1585,101 @@ class PRCommentWorkflow:
         metadata = thread_data.get('metadata', {})
         skip_decision = thread_data.get('skip_decision', {})
         
-        output = []
-        
         # Thread header with metadata
-        output.append(f"# Thread {thread_num:02d}")
-        output.append("")
-        output.append("## Metadata")
-        output.append(f"- **Type**: {thread_data.get('type', 'unknown')}")
-        output.append(f"- **Status**: {metadata.get('status', 'unknown')}")
-        
-        # Add skip information if thread is skipped
+        parts = [THREAD_HEADER_TEMPLATE.format(
+            thread_num=thread_num,
+            type=thread_data.get('type', 'unknown'),
+            status=metadata.get('status', 'unknown')
+        )]
         if skip_decision.get('skip'):
-            output.append(f"- **Skip Reason**: {metadata.get('skip_reason', 'Unknown')}")
-            output.append(f"- **⏭️ Action**: No response needed")
+            parts.append(THREAD_SKIP_TEMPLATE.format(skip_reason=metadata.get('skip_reason', 'Unknown')))
         else:
-            output.append(f"- **💬 Action**: Response required")
-            
+            parts.append(THREAD_ACTION_LINE)
         if thread_data.get('orphaned'):
-            output.append("- **Note**: Reply to missing comment")
-        output.append("")
+            parts.append(THREAD_ORPHAN_LINE)
         
         # Main comment
-        output.append("## Main Comment")
-        output.append("")
-        author = main_comment.get('user', {}).get('login', main_comment.get('author', {}).get('login', 'Unknown'))
-        created_at = main_comment.get('created_at', main_comment.get('createdAt', 'Unknown'))
-        
-        output.append(f"**Author**: {author}")
-        output.append(f"**Created**: {created_at}")
-        output.append(f"**Comment ID**: {main_comment.get('id', 'Unknown')}")
-        
+        parts.append(THREAD_MAIN_TEMPLATE.format(
+            author=main_comment['_author'] or 'Unknown',
+            created=main_comment['_created'] or 'Unknown',
+            id=main_comment.get('id', 'Unknown')
+        ))
         if thread_data.get('type') == 'review':
-            output.append(f"**File**: `{main_comment.get('path', 'Unknown')}`")
+            parts.append(THREAD_FILE_LINE_TEMPLATE.format(path=main_comment.get('path', 'Unknown')))
             if main_comment.get('line'):
-                output.append(f"**Line**: {main_comment.get('line')}")
-        
-        output.append("")
-        output.append("### Content")
-        output.append("")
-        output.append(main_comment.get('body', ''))
-        output.append("")
+                parts.append(THREAD_LINE_NUMBER_TEMPLATE.format(line=main_comment.get('line')))
+        parts.append(THREAD_CONTENT_TEMPLATE.format(body=main_comment.get('body', '')))
         
         # Replies
         if replies:
-            output.append("## Replies")
-            output.append("")
-            
-            sorted_replies = sorted(replies, key=lambda x: x.get('created_at', ''))
-            for i, reply in enumerate(sorted_replies, 1):
-                reply_author = reply.get('user', {}).get('login', 'Unknown')
-                reply_created = reply.get('created_at', 'Unknown')
-                
-                output.append(f"### Reply {i}")
-                output.append("")
-                output.append(f"**Author**: {reply_author}")
-                output.append(f"**Created**: {reply_created}")
-                output.append(f"**Reply ID**: {reply.get('id', 'Unknown')}")
-                output.append("")
-                output.append("#### Content")
-                output.append("")
-                output.append(reply.get('body', ''))
-                output.append("")
-        
-        return "\n".join(output)
-    
-    def _create_session_summary(self, pr_data: Dict, threads: Dict, session_dir: str, skip_stats: Dict) -> str:
+            parts.append(THREAD_REPLIES_HEADER)
+            parts.extend(
+                THREAD_REPLY_TEMPLATE.format(
+                    i=i,
+                    author=reply['_author'] or 'Unknown',
+                    created=reply['_created'] or 'Unknown',
+                    id=reply.get('id', 'Unknown'),
+                    body=reply.get('body', '')
+                )
+                for i, reply in enumerate(replies, 1)
+            )
+        
+        return ''.join(parts)
+    
+    def _sort_threads(self, threads: Dict[str, Dict]) -> List[Tuple[str, str, Dict]]:
+        """Return (created_at, thread_id, thread_data) tuples ordered by the main comment's creation time"""
+        indexed = [(t['main']['_created'], thread_id, t) for thread_id, t in threads.items()]
+        indexed.sort(key=itemgetter(0))
+        return indexed
+    
+    def _create_session_summary(self, pr_data: Dict, threads: Dict, session_dir: str, skip_stats: Dict,
+                                sorted_threads: Optional[List[Tuple[str, str, Dict]]] = None) -> str:
         """Create session summary file"""
-        output = []
-        
-        output.append(f"# PR {pr_data['pr_number']} Review Session")
-        output.append("")
-        output.append(f"**Repository**: {pr_data.get('repo', 'Unknown')}")
-        output.append(f"**PR Title**: {pr_data.get('title', 'Unknown')}")
-        output.append(f"**PR Author**: {pr_data.get('author', 'Unknown')}")
-        output.append(f"**Session Directory**: {session_dir}")
-        output.append(f"**Created**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        output.append("")
-        
-        # Statistics
-        output.append("## Statistics")
-        output.append("")
         general_threads = sum(1 for t in threads.values() if t.get('type') == 'general')
         review_threads = sum(1 for t in threads.values() if t.get('type') == 'review')
         total_replies = sum(len(t.get('replies', [])) for t in threads.values())
         
-        output.append(f"- **Total Threads**: {len(threads)}")
-        output.append(f"- **General Comments**: {general_threads}")
-        output.append(f"- **Review Comments**: {review_threads}")
-        output.append(f"- **Total Replies**: {total_replies}")
-        output.append("")
-        
-        # Skip Analysis
-        output.append("## Skip Analysis")
-        output.append("")
-        output.append(f"- **Total Skipped**: {skip_stats['skipped']}")
-        output.append(f"- **Total Needs Response**: {skip_stats['needs_response']}")
-        output.append("")
+        output = [SESSION_SUMMARY_HEADER_TEMPLATE.format(
+            pr_number=pr_data['pr_number'],
+            repo=pr_data.get('repo', 'Unknown'),
+            title=pr_data.get('title', 'Unknown'),
+            author=pr_data.get('author', 'Unknown'),
+            session_dir=session_dir,
+            created=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            total_threads=len(threads),
+            general_threads=general_threads,
+            review_threads=review_threads,
+            total_replies=total_replies,
+            skipped=skip_stats['skipped'],
+            needs_response=skip_stats['needs_response']
+        )]
         
-        output.append("### Skip Reasons")
         for skip_type, count in skip_stats['skip_reasons'].items():
-            output.append(f"- **{skip_type}**: {count}")
+            output.append(f"- **{skip_type}**: {count}\n")
         
         # Thread list
-        output.append("## Thread Files")
-        output.append("")
+        output.append("## Thread Files\n\n")
         
-        thread_num = 1
-        sorted_threads = sorted(threads.items(), 
-                               key=lambda x: x[1]['main'].get('created_at', x[1]['main'].get('createdAt', '')))
+        if sorted_threads is None:
+            sorted_threads = self._sort_threads(threads)
         
-        for thread_id, thread_data in sorted_threads:
+        # One row per thread, each rendered from the template matching its skip status
+        rows = []
+        for thread_num, (_, _, thread_data) in enumerate(sorted_threads, 1):
             main_comment = thread_data['main']
-            author = main_comment.get('user', {}).get('login', main_comment.get('author', {}).get('login', 'unknown'))
             skip_decision = thread_data.get('skip_decision', {})
-            
-            body = main_comment.get('body', '')
-            topic = body.split('\n')[0][:50]
-            
-            # Add skip indicator to thread listing
-            if skip_decision.get('skip'):
-                status_icon = "⏭️"
-                status_text = f"[SKIP: {skip_decision.get('skip_type', 'unknown')}]"
-            else:
-                status_icon = "💬"
-                status_text = "[NEEDS RESPONSE]"
-            
-            output.append(f"{thread_num}. {status_icon} **{author}** {status_text} - {topic}")
-            thread_num += 1
-        
-        output.append("")
-        output.append("## Next Steps")
-        output.append("")
-        output.append("1. **Review thread files**: Focus on files marked [NEEDS RESPONSE]")
-        output.append("2. **Skip files marked**: ⏭️ SKIP_* files are automatically filtered out")
-        output.append("3. **Systematic responses**: Address each remaining thread systematically")
-        output.append("4. **Search specific content**: `presto search --repo <OWNER/REPO> --pr <PR> --query <text>`")
-        output.append("5. **Post responses**: `presto reply --repo <OWNER/REPO> --pr <PR> --comment-id <ID> --message <text>`")
-        output.append("6. **Draft responses**: `presto append --session-dir <SESSION_DIR> --thread <N> --content <text>`")
-        output.append("7. **Post responses**: `presto post --session-dir <SESSION_DIR> --thread <N>`")
-        output.append("8. **Post all responses**: `presto post --session-dir <SESSION_DIR> --all`")
-        output.append("")
-        
-        return "\n".join(output)
+            row_template = SESSION_SUMMARY_SKIP_ROW if skip_decision.get('skip') else SESSION_SUMMARY_RESPONSE_ROW
+            rows.append(row_template.format(
+                n=thread_num,
+                author=main_comment['_author'] or 'unknown',
+                topic=main_comment.get('body', '').partition('\n')[0][:50],
+                skip_type=skip_decision.get('skip_type', 'unknown')
+            ))
+        output.append(''.join(rows))
+        
+        output.append(SESSION_SUMMARY_NEXT_STEPS)
+        
+        return ''.join(output)
 
     def post_responses(self, session_dir: str, thread_number: int = None, post_all: bool = False, dry_run: bool = False, auto_yes: bool = False) -> bool:
         """
@@ -948,12 +1717,12 @@ class PRCommentWorkflow:
         
         # Get thread files to process
         if thread_number:
-            thread_files = [f for f in os.listdir(session_dir) if f.startswith(f"thread_{thread_number:02d}_")]
+            thread_files = self._find_thread_files(session_dir, thread_number)
             if not thread_files:
                 print(f"❌ Thread {thread_number} not found in session directory")
                 return False
         elif post_all:
-            all_thread_files = [f for f in os.listdir(session_dir) if f.startswith("thread_") and f.endswith(".md")]
+            all_thread_files = [e.name for e in self._scan_thread_files(session_dir)]
             skip_files = [f for f in all_thread_files if "SKIP_" in f]
             thread_files = [f for f in all_thread_files if "SKIP_" not in f]
             
@@ -983,11 +1752,24 @@ class PRCommentWorkflow:
         if dry_run:
             print(f"\n🔍 DRY RUN - Analyzing what would be posted...")
         
+        # Load the manual-skip registry once for every thread in this pass
+        skip_registry = self._load_skip_registry(pr_info['pr_number'])
+        
+        posted_stamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         for thread_file in thread_files:
             filepath = os.path.join(session_dir, thread_file)
             
+            # Read once; the skip check, draft parser and metadata parser all share it
+            try:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    content = f.read()
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"\n📄 Processing: {thread_file}")
+                print(f"   ⚠️  Error reading thread file: {e}")
+                continue
+            
             # Check if thread is manually skipped
-            if self._is_manually_skipped(filepath):
+            if self._is_manually_skipped(filepath, content, skip_registry):
                 if not dry_run:  # Only show skipped in regular mode
                     print(f"\n📄 Processing: {thread_file}")
                     print("   ⏭️  MANUALLY SKIPPED - will not post")
@@ -995,7 +1777,7 @@ class PRCommentWorkflow:
                 continue
             
             # Extract draft responses from thread file
-            draft_responses = self._extract_draft_responses(filepath)
+            draft_responses = self._extract_draft_responses(filepath, content)
             
             if not draft_responses:
                 if not dry_run:  # Only show empty threads in regular mode
@@ -1020,50 +1802,60 @@ class PRCommentWorkflow:
             print(f"\n📄 Processing: {thread_file}")
             
             # Get thread metadata for posting
-            thread_metadata = self._extract_thread_metadata(filepath)
+            thread_metadata = self._extract_thread_metadata(filepath, content)
             if not thread_metadata:
                 print("   ❌ Could not extract thread metadata")
                 continue
             
             # Process each draft response
-            for i, draft in enumerate(draft_responses):
-                if draft['posted']:
-                    print(f"   ⏭️  Draft {i+1}: Already posted ({draft['posted_at']})")
-                    skipped_count += 1
-                    continue
-                
-                print(f"   📝 Draft {i+1} by {draft['author']} ({draft['timestamp']}):")
-                print(f"      Preview: {draft['content'][:100]}...")
-                
-                # Dry run already handled above - should not reach here
-                if dry_run:
-                    continue
-                
-                # Confirm posting
-                if not post_all and thread_number and not auto_yes:
-                    confirm = input("   Post this response? (y/N): ").strip().lower()
-                    if confirm != 'y':
-                        print("   ⏭️  Skipped by user")
+            sections = None
+            dirty = False
+            try:
+                for i, draft in enumerate(draft_responses):
+                    if draft['posted']:
+                        print(f"   ⏭️  Draft {i+1}: Already posted ({draft['posted_at']})")
+                        skipped_count += 1
                         continue
-                elif auto_yes and not post_all and thread_number:
-                    print("   ✅ Auto-confirmed (--yes flag)")
-                
-                # Post to GitHub
-                success = self._post_draft_response(
-                    pr_info['pr_number'],
-                    thread_metadata['comment_id'],
-                    draft['content'],
-                    thread_metadata['comment_type']
-                )
-                
-                if success:
-                    # Mark as posted in the thread file
-                    self._mark_response_as_posted(filepath, i, draft)
-                    print(f"   ✅ Posted successfully!")
-                    posted_count += 1
-                else:
-                    print(f"   ❌ Failed to post")
-                    return False
+                    
+                    print(f"   📝 Draft {i+1} by {draft['author']} ({draft['timestamp']}):")
+                    print(f"      Preview: {draft['content'][:100]}...")
+                    
+                    # Dry run already handled above - should not reach here
+                    if dry_run:
+                        continue
+                    
+                    # Confirm posting
+                    if not post_all and thread_number and not auto_yes:
+                        confirm = input("   Post this response? (y/N): ").strip().lower()
+                        if confirm != 'y':
+                            print("   ⏭️  Skipped by user")
+                            continue
+                    elif auto_yes and not post_all and thread_number:
+                        print("   ✅ Auto-confirmed (--yes flag)")
+                    
+                    # Post to GitHub
+                    success = self._post_draft_response(
+                        pr_info['pr_number'],
+                        thread_metadata['comment_id'],
+                        draft['content'],
+                        thread_metadata['comment_type']
+                    )
+                    
+                    if success:
+                        # Mark as posted in memory; the file is rewritten when the thread is done
+                        if sections is None:
+                            sections = content.split('## 📝 DRAFT RESPONSE')
+                        dirty |= self._mark_response_posted_in_memory(sections, i, posted_stamp)
+                        print(f"   ✅ Posted successfully!")
+                        posted_count += 1
+                    else:
+                        print(f"   ❌ Failed to post")
+                        return False
+            finally:
+                # Write as soon as the thread is done (even on failure) so drafts that
+                # reached GitHub are marked before anything else can interrupt the run
+                if dirty:
+                    self._write_draft_sections(filepath, sections)
         
         # Summary
         print(f"\n📊 Summary:")
@@ -1104,170 +1896,199 @@ class PRCommentWorkflow:
         
         return None
     
-    def _extract_draft_responses(self, filepath: str) -> List[Dict[str, Any]]:
-        """Extract draft responses from a thread file"""
+    def _extract_draft_responses(self, filepath: str, content: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Extract draft responses from a thread file (or its already-read content)"""
         draft_responses = []
         
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
+            if content is None:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    content = f.read()
             
             # Find all DRAFT RESPONSE sections
             sections = content.split('## 📝 DRAFT RESPONSE')
             
-            for i, section in enumerate(sections[1:]):  # Skip first section (before any drafts)
-                lines = section.split('\n')
-                
-                # Extract timestamp from first line
-                timestamp_line = lines[0].strip() if lines else ""
-                timestamp = timestamp_line.strip('()')
-                
-                # Extract author
-                author = "AI Assistant"  # default
-                content_lines = []
-                posted_info = None
-                
-                for line in lines[1:]:
-                    if line.startswith('**Author**:'):
-                        author = line.split(':', 1)[1].strip()
-                    elif line.startswith('**POSTED**:'):
-                        posted_info = line.split(':', 1)[1].strip()
-                    elif line.strip() and not line.startswith('**') and not line.startswith('---'):
-                        content_lines.append(line)
-                
-                # Join content (skip metadata lines)
-                draft_content = '\n'.join(content_lines).strip()
-                
-                if draft_content:
-                    draft_responses.append({
-                        'timestamp': timestamp,
-                        'author': author,
-                        'content': draft_content,
-                        'posted': bool(posted_info),
-                        'posted_at': posted_info if posted_info else None
-                    })
+            for section in sections[1:]:  # Skip first section (before any drafts)
+                draft = self._parse_draft_section(section)
+                if draft:
+                    draft_responses.append(draft)
         
         except Exception as e:
             print(f"   ⚠️  Error reading draft responses: {e}")
         
         return draft_responses
     
-    def _extract_thread_metadata(self, filepath: str) -> Optional[Dict[str, Any]]:
+    def _parse_draft_section(self, section: str) -> Optional[Dict[str, Any]]:
+        """Parse the text following one draft response header; None if it has no content"""
+        # Extract timestamp from first line
+        timestamp_line, _, body = section.partition('\n')
+        timestamp = timestamp_line.strip().strip('()')
+        
+        author = "AI Assistant"  # default
+        posted_info = None
+        for key, value in _DRAFT_FIELD_RE.findall(body):
+            if key == 'Author':
+                author = value.strip()
+            elif key == 'POSTED':
+                posted_info = value.strip()
+        
+        # Content is whatever is left once metadata, rules and blank lines are dropped
+        draft_content = _DRAFT_NOISE_RE.sub('', body).strip()
+        if not draft_content:
+            return None
+        
+        return {
+            'timestamp': timestamp,
+            'author': author,
+            'content': draft_content,
+            'posted': bool(posted_info),
+            'posted_at': posted_info if posted_info else None
+        }
+    
+    def _has_unposted_drafts(self, filepath: str) -> bool:
+        """
+        Check a thread file for a draft that has not been posted yet.
+        The file is memory-mapped and only the draft sections are decoded, so the
+        (usually much larger) comment text ahead of the first draft is never copied.
+        """
+        try:
+            with open(filepath, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return False
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    start = mm.find(_DRAFT_HEADER_BYTES)
+                    while start != -1:
+                        start += len(_DRAFT_HEADER_BYTES)
+                        end = mm.find(_DRAFT_HEADER_BYTES, start)
+                        section = mm[start:end if end != -1 else len(mm)].decode('utf-8')
+                        draft = self._parse_draft_section(section)
+                        if draft and not draft['posted']:
+                            return True
+                        start = end
+        except (OSError, ValueError) as e:
+            print(f"   ⚠️  Error reading draft responses: {e}")
+        return False
+    
+    def _extract_thread_metadata(self, filepath: str, content: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Extract thread metadata needed for posting"""
         try:
+            if content is not None:
+                return self._parse_thread_metadata(_FIELD_RE.finditer(content))
+            # Both fields sit in the header, so stop reading as soon as they are found
             with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Look for comment ID and type in the thread content
-            comment_id = None
-            comment_type = 'review'  # default
-            
-            lines = content.split('\n')
-            for line in lines:
-                if '**Comment ID**:' in line or '**ID**:' in line:
-                    comment_id = line.split(':', 1)[1].strip()
-                elif '**Type**:' in line:
-                    type_val = line.split(':', 1)[1].strip().lower()
-                    if 'general' in type_val:
-                        comment_type = 'general'
-            
-            if comment_id:
-                return {
-                    'comment_id': comment_id,
-                    'comment_type': comment_type
-                }
+                return self._parse_thread_metadata(filter(None, map(_FIELD_RE.match, f)))
         
         except Exception as e:
             print(f"   ⚠️  Error reading thread metadata: {e}")
         
         return None
     
+    def _parse_thread_metadata(self, matches: Iterable) -> Optional[Dict[str, Any]]:
+        """Pick the header comment ID and type out of _FIELD_RE matches"""
+        comment_id = None
+        comment_type = 'review'  # default
+        type_seen = False
+        
+        # The header fields come first; later matches would be quoted text
+        for match in matches:
+            key, value = match.groups()
+            if key in ('Comment ID', 'ID'):
+                if comment_id is None:
+                    comment_id = value.strip()
+            elif key == 'Type' and not type_seen:
+                type_seen = True
+                if 'general' in value.lower():
+                    comment_type = 'general'
+            if comment_id is not None and type_seen:
+                break
+        
+        if comment_id:
+            return {
+                'comment_id': comment_id,
+                'comment_type': comment_type
+            }
+        return None
+    
     def _post_draft_response(self, pr_number: int, comment_id: str, content: str, comment_type: str) -> bool:
         """Post a draft response to GitHub"""
         return self.reply_to_comment(pr_number, comment_id, content, comment_type)
     
-    def _mark_response_as_posted(self, filepath: str, draft_index: int, draft: Dict[str, Any]) -> bool:
-        """Mark a draft response as posted in the thread file"""
+    def _write_draft_sections(self, filepath: str, sections: List[str]) -> None:
+        """Write back a thread file whose draft sections gained POSTED markers"""
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Find the specific draft response section
-            sections = content.split('## 📝 DRAFT RESPONSE')
-            
-            if draft_index + 1 < len(sections):
-                # Add POSTED marker to this section
-                section = sections[draft_index + 1]
-                lines = section.split('\n')
-                
-                # Insert POSTED marker after author line
-                new_lines = []
-                for line in lines:
-                    new_lines.append(line)
-                    if line.startswith('**Author**:'):
-                        new_lines.append(f"**POSTED**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                
-                # Reconstruct the content
-                sections[draft_index + 1] = '\n'.join(new_lines)
-                new_content = '## 📝 DRAFT RESPONSE'.join(sections)
-                
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(new_content)
-                
-                return True
-        
-        except Exception as e:
+            _write_text_file(filepath, '## 📝 DRAFT RESPONSE'.join(sections))
+        except OSError as e:
             print(f"   ⚠️  Error marking response as posted: {e}")
+    
+    def _mark_response_posted_in_memory(self, sections: List[str], draft_index: int, stamp: Optional[str] = None) -> bool:
+        """Insert a POSTED marker into a draft section; returns True if it was found"""
+        if draft_index + 1 >= len(sections):
+            return False
+        if stamp is None:
+            stamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
-        return False
+        # Insert POSTED marker after author line
+        new_lines = []
+        for line in sections[draft_index + 1].split('\n'):
+            new_lines.append(line)
+            if line.startswith('**Author**:'):
+                new_lines.append(f"**POSTED**: {stamp}")
+        
+        sections[draft_index + 1] = '\n'.join(new_lines)
+        return True
 
     def _get_pr_config_path(self, pr_number: int) -> str:
         """Return path to persistent configuration file for this PR"""
-        base_dir = os.path.expanduser("~/.presto")
-        repo_dir = os.path.join(base_dir, self.repo_owner, self.repo_name)
+        repo_dir = os.path.join(PRESTO_HOME, self.repo_owner, self.repo_name)
         os.makedirs(repo_dir, exist_ok=True)
         return os.path.join(repo_dir, f"{pr_number}.txt")
 
     def _load_skip_registry(self, pr_number: int) -> set:
-        """Load skip registry for PR, return set of thread numbers (int)"""
+        """Load skip registry for PR, return set of thread numbers (int); read once per workflow"""
         path = self._get_pr_config_path(pr_number)
-        if not os.path.exists(path):
-            return set()
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                return {int(x.strip()) for x in f.readlines() if x.strip().isdigit()}
-        except Exception:
-            return set()
+        registry = self._skip_registry_cache.get(path)
+        if registry is None:
+            registry = set()
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    registry = {int(x) for x in map(str.strip, f) if x.isdigit()}
+            except Exception:
+                pass
+            self._skip_registry_cache[path] = registry
+        return registry
 
     def _save_skip_registry(self, pr_number: int, threads: set):
         """Save skip registry for PR"""
         path = self._get_pr_config_path(pr_number)
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                for t in sorted(threads):
-                    f.write(f"{t}\n")
+            _write_bytes_atomic(path, "".join(f"{t}\n" for t in sorted(threads)).encode("utf-8"))
+            self._skip_registry_cache[path] = set(threads)
         except Exception as e:
             print(f"⚠️  Error saving PR configuration: {e}")
 
-    def _is_manually_skipped(self, filepath: str) -> bool:
-        """Check if a thread file is manually marked as skipped or in registry"""
+    def _is_manually_skipped(self, filepath: str, content: Optional[str] = None, registry: Optional[set] = None) -> bool:
+        """Check if a thread file is in the skip registry or manually marked as skipped"""
+        # Registry first: a set lookup is far cheaper than reading the file
+        if registry is None:
+            pr_info = self._extract_pr_info_from_session(os.path.dirname(filepath))
+            if pr_info:
+                registry = self._load_skip_registry(pr_info['pr_number'])
+        if registry:
+            try:
+                if int(os.path.basename(filepath).split('_')[1]) in registry:
+                    return True
+            except (IndexError, ValueError):
+                pass
+        
+        if content is not None:
+            return '**MANUAL_SKIP**:' in content
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-            if '**MANUAL_SKIP**:' in content:
-                return True
+                for line in f:
+                    if '**MANUAL_SKIP**:' in line:
+                        return True
         except Exception:
             pass
-        # Check registry
-        session_dir = os.path.dirname(filepath)
-        pr_info = self._extract_pr_info_from_session(session_dir)
-        if pr_info:
-            registry = self._load_skip_registry(pr_info['pr_number'])
-            try:
-                thread_num = int(os.path.basename(filepath).split('_')[1])
-                return thread_num in registry
-            except (IndexError, ValueError):
-                return False
         return False
 
     def toggle_manual_skip(self, session_dir: str, thread_number: int, mark_skip: bool) -> bool:
@@ -1288,7 +2109,7 @@ class PRCommentWorkflow:
 
         # existing logic unchanged below
         try:
-            thread_files = [f for f in os.listdir(session_dir) if f.startswith(f"thread_{thread_number:02d}_")]
+            thread_files = self._find_thread_files(session_dir, thread_number)
             if not thread_files:
                 print(f"❌ Thread {thread_number} not found in session directory")
                 return False
@@ -1310,6 +2131,7 @@ class PRCommentWorkflow:
                 new_lines = lines
             with open(thread_file, 'w', encoding='utf-8') as f:
                 f.write('\n'.join(new_lines))
+            _session_thread_entries.pop(session_dir, None)
             return True
         except Exception as e:
             print(f"❌ Error modifying manual skip status: {e}")
@@ -1322,13 +2144,17 @@ class PRCommentWorkflow:
         registry = self._load_skip_registry(pr_number) if pr_number else set()
         super_list = []  # collect thread info
         try:
-            thread_files = [f for f in os.listdir(session_dir) if f.startswith("thread_") and f.endswith(".md")]
-            thread_files.sort()
-            for thread_file in thread_files:
-                filepath = os.path.join(session_dir, thread_file)
-                thread_num = int(thread_file.split('_')[1])
-                if thread_num in registry or '**MANUAL_SKIP**:' in open(filepath, encoding='utf-8').read():
-                    super_list.append(thread_file)
+            for entry in self._scan_thread_files(session_dir):
+                thread_num = int(entry.name.split('_')[1])
+                # The registry answers most lookups; empty files cannot carry a marker
+                if thread_num in registry:
+                    super_list.append(entry.name)
+                    continue
+                if not entry.stat().st_size:
+                    continue
+                with open(entry.path, 'r', encoding='utf-8') as f:
+                    if any('**MANUAL_SKIP**:' in line for line in f):
+                        super_list.append(entry.name)
         except Exception as e:
             print(f"❌ Error listing skipped threads: {e}")
             return
@@ -1344,21 +2170,52 @@ class PRCommentWorkflow:
         if provided_session_dir:
             return provided_session_dir
         
-        # Look for pr_*_review_* directories in current directory
+        # Detected once per workflow; cleanup and analyze reset it
+        if self._detected_session is not None:
+            return self._detected_session
+        if self._no_sessions_found:
+            raise ValueError(NO_SESSIONS_MESSAGE)
+        
+        # Look for pr_*_review_* directories in current directory; only the
+        # filesystem calls can fail here
         try:
-            candidates = [d for d in os.listdir('.') if d.startswith('pr_') and '_review_' in d and os.path.isdir(d)]
-            if not candidates:
-                raise ValueError("No session directories found. Run 'presto analyze' first.")
-            
-            # Sort by creation time, most recent first
-            candidates.sort(key=lambda d: os.path.getctime(d), reverse=True)
-            session_dir = candidates[0]
-            print(f"🔍 Auto-detected session directory: {session_dir}")
-            return session_dir
+            # Keep the name match ahead of is_dir(): names are free, while is_dir() falls back to a
+            # stat for symlinks and on filesystems without d_type. Unrelated files in the working
+            # directory must never cost a syscall.
+            with os.scandir('.') as entries:
+                candidates = [e for e in entries if _SESSION_RE.match(e.name) and e.is_dir()]
             
-        except Exception as e:
+            # Only stat when there is more than one session to choose from (most recent first)
+            if len(candidates) > 1:
+                candidates.sort(key=lambda e: e.stat().st_ctime_ns, reverse=True)
+        except OSError as e:
             raise ValueError(f"Could not auto-detect session directory: {e}")
+        
+        if not candidates:
+            self._no_sessions_found = True
+            raise ValueError(NO_SESSIONS_MESSAGE)
+        
+        session_dir = candidates[0].name
+        print(f"🔍 Auto-detected session directory: {session_dir}")
+        self._detected_session = session_dir
+        return session_dir
 
+    def _find_unposted_thread(self, entries: List[os.DirEntry]) -> Optional[str]:
+        """Return the name of a thread file with unposted drafts, or None"""
+        # One unposted draft is enough to refuse, so stop at the first hit
+        if len(entries) < 4:
+            return next((entry.name for entry in entries if self._has_unposted_drafts(entry.path)), None)
+        
+        # Larger sessions: overlap the file reads, cancelling whatever hasn't started once one hits
+        with ThreadPoolExecutor(max_workers=min(8, len(entries))) as executor:
+            futures = {executor.submit(self._has_unposted_drafts, entry.path): entry.name for entry in entries}
+            for future in as_completed(futures):
+                if future.result():
+                    for pending in futures:
+                        pending.cancel()
+                    return futures[future]
+        return None
+    
     def cleanup_session(self, session_dir: str, force: bool = False) -> bool:
         """Clean up session directory and files"""
         try:
@@ -1368,23 +2225,18 @@ class PRCommentWorkflow:
             
             # Check for unposted draft responses unless force is used
             if not force:
-                thread_files = [f for f in os.listdir(session_dir) if f.startswith("thread_") and f.endswith(".md")]
-                unposted_count = 0
-                
-                for thread_file in thread_files:
-                    filepath = os.path.join(session_dir, thread_file)
-                    draft_responses = self._extract_draft_responses(filepath)
-                    unposted_drafts = [d for d in draft_responses if not d['posted']]
-                    unposted_count += len(unposted_drafts)
+                unposted = self._find_unposted_thread(self._scan_thread_files(session_dir))
                 
-                if unposted_count > 0:
-                    print(f"⚠️  Found {unposted_count} unposted draft responses in session")
+                if unposted:
+                    print(f"⚠️  Found unposted draft responses in session (e.g. {unposted})")
                     print(f"💡 Use --force to cleanup anyway, or post responses first with 'presto post --all'")
                     return False
             
             # Remove the entire session directory
-            import shutil
             shutil.rmtree(session_dir)
+            _session_manifests.pop(session_dir, None)
+            _session_thread_entries.pop(session_dir, None)
+            self._detected_session = None
             print(f"🗑️  Removed session directory: {session_dir}")
             return True
             
@@ -1392,16 +2244,8 @@ class PRCommentWorkflow:
             print(f"❌ Error during cleanup: {e}")
             return False
 
-def main():
-    # Handle bootstrap prompt when no arguments provided
-    if len(sys.argv) == 1:
-        display_bootstrap_prompt()
-        return
-    
-    parser = argparse.ArgumentParser(
-        description="Presto: GitHub PR Comment Workflow Tool",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
+# Top-level `presto --help` epilog
+CLI_EPILOG = """
 Available Commands:
   analyze     Run Phase 1: Extract and organize PR comment threads (default)
   reply       Reply to a specific comment on GitHub
@@ -1421,83 +2265,118 @@ Examples:
   presto cleanup
 
 For command-specific help: presto <command> --help
-        """)
-    
-    # Create subparsers for different commands
-    subparsers = parser.add_subparsers(dest='command', help='Available commands')
-    
-    # ANALYZE command (default Phase 1 workflow)
-    analyze_parser = subparsers.add_parser(
+        """
+
+
+# Section banners printed by main() for each mode
+_BANNER = "=" * 60
+_MODE_HEADERS = {
+    'append': f"\n{_BANNER}\n📝 APPEND RESPONSE MODE (Phase 5)\n{_BANNER}",
+    'post': f"\n{_BANNER}\n📤 POST MODE (Phase 6)\n{_BANNER}",
+    'skip': f"\n{_BANNER}\n⏭️ SKIP CONTROL MODE\n{_BANNER}",
+    'cleanup': f"\n{_BANNER}\n🗑️ CLEANUP MODE\n{_BANNER}",
+    'reply': f"\n{_BANNER}\n💬 REPLY MODE (Phase 6)\n{_BANNER}",
+    'analyze': f"\n{_BANNER}\n🔄 PHASE 1: THREAD EXTRACTION & ORGANIZATION\n{_BANNER}",
+    'save': f"\n{_BANNER}\n💾 SAVING FORMATTED COMMENTS\n{_BANNER}",
+    'suggestions': f"\n{_BANNER}\n📊 ANALYSIS SUGGESTIONS\n{_BANNER}",
+}
+_SEARCH_HEADER_TEMPLATE = f"\n{_BANNER}\n🔍 SEARCH MODE: '{{query}}'\n{_BANNER}"
+
+# One-line summaries shown in `presto --help`
+SUBCOMMAND_HELP = {
+    'analyze': 'Extract and organize PR comment threads (Phase 1)',
+    'reply': 'Reply to a specific comment on GitHub',
+    'append': 'Append draft response to thread file (Phase 5)',
+    'search': 'Search comments for specific text',
+    'post': 'Post draft responses from thread files (Phase 6)',
+    'skip': 'Manually mark/unmark threads to skip posting',
+    'cleanup': 'Remove session directory and thread files',
+}
+
+
+def _add_analyze_parser(subparsers) -> 'argparse.ArgumentParser':
+    """Register the `analyze` subcommand and return its parser"""
+    parser = subparsers.add_parser(
         'analyze', 
-        help='Extract and organize PR comment threads (Phase 1)',
+        help=SUBCOMMAND_HELP['analyze'],
         description='Run Phase 1: Thread Extraction & Organization. This is the core workflow that fetches PR comments, organizes them into threads, applies skip logic, and creates session files.',
-        formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
   presto analyze --repo microsoft/vscode --pr 123
   presto analyze --repo owner/repo --pr 456 --save
   presto analyze --repo owner/repo --pr 789 --save --output custom_filename.md
         """)
-    analyze_parser.add_argument("--repo", required=True, help="Repository in format owner/repo")
-    analyze_parser.add_argument("--pr", required=True, type=int, help="PR number to analyze")
-    analyze_parser.add_argument("--save", action="store_true", help="Additionally save formatted comments to a single file")
-    analyze_parser.add_argument("--output", help="Output filename for --save option (optional)")
-    
-    # REPLY command
-    reply_parser = subparsers.add_parser(
+    parser.add_argument("--repo", required=True, help="Repository in format owner/repo")
+    parser.add_argument("--pr", required=True, type=int, help="PR number to analyze")
+    parser.add_argument("--save", action="store_true", help="Additionally save formatted comments to a single file")
+    parser.add_argument("--output", help="Output filename for --save option (optional)")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached PR comments and re-fetch from GitHub")
+    return parser
+
+
+def _add_reply_parser(subparsers) -> 'argparse.ArgumentParser':
+    """Register the `reply` subcommand and return its parser"""
+    parser = subparsers.add_parser(
         'reply',
-        help='Reply to a specific comment on GitHub',
+        help=SUBCOMMAND_HELP['reply'],
         description='Post a reply to a specific comment. Use this for Phase 6: Automated Posting.',
-        formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
   presto reply --repo owner/repo --pr 123 --comment-id 456789 --message "Thanks for the feedback!"
   presto reply --repo owner/repo --pr 123 --comment-id 456789 --message "Here's the fix: [code]"
         """)
-    reply_parser.add_argument("--repo", required=True, help="Repository in format owner/repo")
-    reply_parser.add_argument("--pr", required=True, type=int, help="PR number")
-    reply_parser.add_argument("--comment-id", required=True, help="Comment ID to reply to")
-    reply_parser.add_argument("--message", required=True, help="Reply message content")
-    
-    # APPEND command (Phase 5 convenience)
-    append_parser = subparsers.add_parser(
+    parser.add_argument("--repo", required=True, help="Repository in format owner/repo")
+    parser.add_argument("--pr", required=True, type=int, help="PR number")
+    parser.add_argument("--comment-id", required=True, help="Comment ID to reply to")
+    parser.add_argument("--message", required=True, help="Reply message content")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached PR comments and re-fetch from GitHub")
+    return parser
+
+
+def _add_append_parser(subparsers) -> 'argparse.ArgumentParser':
+    """Register the `append` subcommand and return its parser"""
+    parser = subparsers.add_parser(
         'append',
-        help='Append draft response to thread file (Phase 5)',
+        help=SUBCOMMAND_HELP['append'],
         description='Append a draft response to a thread file for review before posting. This supports Phase 5: Implementation & Follow-up.',
-        formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
   presto append --thread 1 --content "Thanks for the feedback!"                                   # Auto-detect session
   presto append --thread 2 --content "Here's a fix..." --author "Senior Dev"                     # Auto-detect session
   presto append --session-dir pr_123_review_20240101_120000 --thread 3 --content "Response..."   # Specific session
         """)
-    append_parser.add_argument("--session-dir", help="Session directory containing thread files (auto-detected if not specified)")
-    append_parser.add_argument("--thread", required=True, type=int, help="Thread number to append response to")
-    append_parser.add_argument("--content", required=True, help="Response content to append")
-    append_parser.add_argument("--author", default="AI Assistant", help="Author name for the response")
-    
-    # SEARCH command
-    search_parser = subparsers.add_parser(
+    parser.add_argument("--session-dir", help="Session directory containing thread files (auto-detected if not specified)")
+    parser.add_argument("--thread", required=True, type=int, help="Thread number to append response to")
+    parser.add_argument("--content", required=True, help="Response content to append")
+    parser.add_argument("--author", default="AI Assistant", help="Author name for the response")
+    return parser
+
+
+def _add_search_parser(subparsers) -> 'argparse.ArgumentParser':
+    """Register the `search` subcommand and return its parser"""
+    parser = subparsers.add_parser(
         'search',
-        help='Search comments for specific text',
+        help=SUBCOMMAND_HELP['search'],
         description='Search through PR comments for specific text patterns. Useful for finding relevant discussions.',
-        formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
   presto search --repo owner/repo --pr 123 --query "validation"
   presto search --repo owner/repo --pr 123 --query "security concern"
   presto search --repo owner/repo --pr 123 --query "TODO"
         """)
-    search_parser.add_argument("--repo", required=True, help="Repository in format owner/repo")
-    search_parser.add_argument("--pr", required=True, type=int, help="PR number to search")
-    search_parser.add_argument("--query", required=True, help="Text to search for in comments")
-    
-    # POST command (Phase 6 workflow)
-    post_parser = subparsers.add_parser(
+    parser.add_argument("--repo", required=True, help="Repository in format owner/repo")
+    parser.add_argument("--pr", required=True, type=int, help="PR number to search")
+    parser.add_argument("--query", required=True, help="Text to search for in comments")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached PR comments and re-fetch from GitHub")
+    return parser
+
+
+def _add_post_parser(subparsers) -> 'argparse.ArgumentParser':
+    """Register the `post` subcommand and return its parser"""
+    parser = subparsers.add_parser(
         'post',
-        help='Post draft responses from thread files (Phase 6)',
+        help=SUBCOMMAND_HELP['post'],
         description='Read draft responses from thread files and post them to GitHub. This implements Phase 6: Automated Posting with double-post protection.',
-        formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
   presto post 1                                                            # Post thread 1 (auto-detect session)
@@ -1506,18 +2385,20 @@ Examples:
   presto post --all                                                        # Post all threads (auto-detect session)
   presto post 1 --session-dir pr_123_review_20240101_120000                # Post thread 1 (specific session)
         """)
-    post_parser.add_argument("thread", type=int, nargs='?', help="Thread number to post (optional)")
-    post_parser.add_argument("--session-dir", help="Session directory containing thread files (auto-detected if not specified)")
-    post_parser.add_argument("--all", action="store_true", help="Post all unposted draft responses")
-    post_parser.add_argument("--dry-run", action="store_true", help="Show what would be posted without actually posting")
-    post_parser.add_argument("-y", "--yes", action="store_true", help="Auto-confirm posting without prompts")
-    
-    # SKIP command (Manual skip control)
-    skip_parser = subparsers.add_parser(
+    parser.add_argument("thread", type=int, nargs='?', help="Thread number to post (optional)")
+    parser.add_argument("--session-dir", help="Session directory containing thread files (auto-detected if not specified)")
+    parser.add_argument("--all", action="store_true", help="Post all unposted draft responses")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would be posted without actually posting")
+    parser.add_argument("-y", "--yes", action="store_true", help="Auto-confirm posting without prompts")
+    return parser
+
+
+def _add_skip_parser(subparsers) -> 'argparse.ArgumentParser':
+    """Register the `skip` subcommand and return its parser"""
+    parser = subparsers.add_parser(
         'skip',
-        help='Manually mark/unmark threads to skip posting',
+        help=SUBCOMMAND_HELP['skip'],
         description='Mark threads as manually skipped so they won\'t be posted even with draft responses. Useful when you draft a response but decide not to post it.',
-        formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
   presto skip 1                                                            # Mark thread 1 as skipped (auto-detect session)
@@ -1525,36 +2406,85 @@ Examples:
   presto skip --list                                                       # List all manually skipped threads (auto-detect)
   presto skip 1 --session-dir pr_123_review_20240101_120000                # Mark thread 1 as skipped (specific session)
         """)
-    skip_parser.add_argument("thread", type=int, nargs='?', help="Thread number to mark/unmark as skipped")
-    skip_parser.add_argument("--session-dir", help="Session directory containing thread files (auto-detected if not specified)")
-    skip_parser.add_argument("--unmark", action="store_true", help="Remove manual skip marker from thread")
-    skip_parser.add_argument("--list", action="store_true", help="List all manually skipped threads")
-    
-    # CLEANUP command
-    cleanup_parser = subparsers.add_parser(
+    parser.add_argument("thread", type=int, nargs='?', help="Thread number to mark/unmark as skipped")
+    parser.add_argument("--session-dir", help="Session directory containing thread files (auto-detected if not specified)")
+    parser.add_argument("--unmark", action="store_true", help="Remove manual skip marker from thread")
+    parser.add_argument("--list", action="store_true", help="List all manually skipped threads")
+    return parser
+
+
+def _add_cleanup_parser(subparsers) -> 'argparse.ArgumentParser':
+    """Register the `cleanup` subcommand and return its parser"""
+    parser = subparsers.add_parser(
         'cleanup',
-        help='Remove session directory and thread files',
+        help=SUBCOMMAND_HELP['cleanup'],
         description='Remove a session directory and all its thread files. Warns if unposted draft responses exist.',
-        formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
   presto cleanup                                                           # Clean up auto-detected session
   presto cleanup --session-dir pr_123_review_20240101_120000              # Clean up specific session
   presto cleanup --force                                                  # Force cleanup even with unposted responses
         """)
-    cleanup_parser.add_argument("--session-dir", help="Session directory to remove (auto-detected if not specified)")
-    cleanup_parser.add_argument("--force", action="store_true", help="Force cleanup even if unposted draft responses exist")
+    parser.add_argument("--session-dir", help="Session directory to remove (auto-detected if not specified)")
+    parser.add_argument("--force", action="store_true", help="Force cleanup even if unposted draft responses exist")
+    return parser
+
+
+# Subcommand name -> builder, in the order they appear in help output
+SUBCOMMAND_BUILDERS = {
+    'analyze': _add_analyze_parser,
+    'reply': _add_reply_parser,
+    'append': _add_append_parser,
+    'search': _add_search_parser,
+    'post': _add_post_parser,
+    'skip': _add_skip_parser,
+    'cleanup': _add_cleanup_parser,
+}
+
+
+def main():
+    # Handle bootstrap prompt when no arguments provided
+    if len(sys.argv) == 1:
+        display_bootstrap_prompt()
+        return
+    
+    # CLI-only import, so importing app as a library doesn't pay for argparse
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        description="Presto: GitHub PR Comment Workflow Tool",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=CLI_EPILOG)
+    
+    # Create subparsers for different commands
+    # Subcommand parsers share the top-level formatter so their epilogs keep their layout
+    subparsers = parser.add_subparsers(
+        dest='command', help='Available commands',
+        parser_class=functools.partial(argparse.ArgumentParser, formatter_class=argparse.RawDescriptionHelpFormatter))
+    
+    # Only build the subcommand being run; unknown commands and the legacy
+    # flag-only form get the full set
+    command = sys.argv[1]
+    if command in SUBCOMMAND_BUILDERS:
+        command_parsers = {command: SUBCOMMAND_BUILDERS[command](subparsers)}
+    elif sys.argv[1:] in (['-h'], ['--help']):
+        # Top-level help only lists each subcommand's summary, so empty parsers will do
+        command_parsers = {name: subparsers.add_parser(name, help=help_text)
+                           for name, help_text in SUBCOMMAND_HELP.items()}
+    else:
+        command_parsers = {name: build(subparsers) for name, build in SUBCOMMAND_BUILDERS.items()}
     
     args = parser.parse_args()
     
     # If no command specified, default to analyze for backward compatibility
-    if not hasattr(args, 'command') or args.command is None:
-        # Check if old-style arguments are provided
-        if '--repo' in sys.argv and '--pr' in sys.argv:
+    if args.command is None:
+        # Old-style invocations lead with flags; only then look for --repo/--pr
+        legacy_args = frozenset(sys.argv[1:]) if sys.argv[1].startswith('-') else frozenset()
+        if '--repo' in legacy_args and '--pr' in legacy_args:
             print("⚠️  Using legacy argument format. Consider using: presto analyze --repo ... --pr ...")
             args.command = 'analyze'
             # Re-parse with analyze parser for backward compatibility
-            analyze_args = analyze_parser.parse_args(sys.argv[1:])
+            analyze_args = command_parsers['analyze'].parse_args(sys.argv[1:])
             args = analyze_args
             args.command = 'analyze'
         else:
@@ -1577,9 +2507,7 @@ Examples:
     
     # Handle commands that don't need PR data first
     if args.command == 'append':
-        print("\n" + "="*60)
-        print("📝 APPEND RESPONSE MODE (Phase 5)")
-        print("="*60)
+        print(_MODE_HEADERS['append'])
         
         # Auto-detect session directory if not provided
         session_dir = workflow._auto_detect_session_dir(args.session_dir)
@@ -1600,9 +2528,7 @@ Examples:
         return
     
     elif args.command == 'post':
-        print("\n" + "="*60)
-        print("📤 POST MODE (Phase 6)")
-        print("="*60)
+        print(_MODE_HEADERS['post'])
         
         # Auto-detect session directory if not provided
         session_dir = workflow._auto_detect_session_dir(args.session_dir)
@@ -1617,9 +2543,7 @@ Examples:
         return
     
     elif args.command == 'skip':
-        print("\n" + "="*60)
-        print("⏭️ SKIP CONTROL MODE")
-        print("="*60)
+        print(_MODE_HEADERS['skip'])
         
         # Auto-detect session directory if not provided
         session_dir = workflow._auto_detect_session_dir(args.session_dir)
@@ -1640,9 +2564,7 @@ Examples:
         return
     
     elif args.command == 'cleanup':
-        print("\n" + "="*60)
-        print("🗑️ CLEANUP MODE")
-        print("="*60)
+        print(_MODE_HEADERS['cleanup'])
         
         # Auto-detect session directory if not provided
         session_dir = workflow._auto_detect_session_dir(args.session_dir)
@@ -1658,7 +2580,7 @@ Examples:
     # For commands that need PR data, fetch it first
     if args.command in ['reply', 'search', 'analyze']:
         print(f"🔍 Fetching PR #{args.pr} from {args.repo}...")
-        pr_data = workflow.fetch_pr_comments(args.pr)
+        pr_data = workflow.fetch_pr_comments(args.pr, refresh=getattr(args, 'refresh', False))
         
         if not pr_data:
             print("Failed to fetch PR data. Check the PR number and repository.")
@@ -1668,9 +2590,7 @@ Examples:
         pr_data['repo'] = args.repo
         
         if args.command == 'reply':
-            print("\n" + "="*60)
-            print("💬 REPLY MODE (Phase 6)")
-            print("="*60)
+            print(_MODE_HEADERS['reply'])
             comment_info = workflow.get_comment_by_id(pr_data, args.comment_id)
             if not comment_info:
                 print(f"Comment ID {args.comment_id} not found in PR #{args.pr}")
@@ -1684,49 +2604,42 @@ Examples:
                 print("❌ Failed to post reply.")
             sys.exit(1)
         elif args.command == 'search':
-            print("\n" + "="*60)
-            print(f"🔍 SEARCH MODE: '{args.query}'")
-            print("="*60)
+            print(_SEARCH_HEADER_TEMPLATE.format(query=args.query))
             matches = workflow.find_comment_by_text(pr_data, args.query)
             if matches:
                 print(f"Found {len(matches)} matching comments:")
                 for i, match in enumerate(matches, 1):
-                    print(f"\n--- Match {i} ---")
-                    print(f"Type: {match['type']}")
-                    print(f"ID: {match['id']}")
-                    print(f"Author: {match['author']}")
-                    print(f"Created: {match['created_at']}")
+                    body = match['body']
+                    review_lines = ""
                     if match['type'] == 'review':
-                        print(f"File: {match['path']}")
+                        review_lines = f"File: {match['path']}\n"
                         if match['line']:
-                            print(f"Line: {match['line']}")
+                            review_lines += f"Line: {match['line']}\n"
                         if match['in_reply_to_id']:
-                            print(f"Reply to ID: {match['in_reply_to_id']}")
-                    print(f"Body: {match['body'][:100]}..." if len(match['body']) > 100 else f"Body: {match['body']}")
-                    print(f"\n💡 To reply: presto reply --repo {args.repo} --pr {args.pr} --comment-id {match['id']} --message '<your response>'")
+                            review_lines += f"Reply to ID: {match['in_reply_to_id']}\n"
+                    print(SEARCH_MATCH_TEMPLATE.format_map({
+                        **match,
+                        'i': i,
+                        'review_lines': review_lines,
+                        'body_preview': body[:100] + "..." if len(body) > 100 else body,
+                        'repo': args.repo,
+                        'pr': args.pr,
+                    }))
             else:
                 print("No matching comments found.")
             return
         elif args.command == 'analyze':
             # PHASE 1: ALWAYS extract and organize threads (core workflow)
-            print("\n" + "="*60)
-            print("🔄 PHASE 1: THREAD EXTRACTION & ORGANIZATION")
-            print("="*60)
+            print(_MODE_HEADERS['analyze'])
             session_dir, threads, skip_stats = workflow.extract_and_organize_threads(pr_data)
             
             # Optional: Also save formatted comments to single file if requested
             if hasattr(args, 'save') and args.save:
-                print("\n" + "="*60)
-                print("💾 SAVING FORMATTED COMMENTS")
-                print("="*60)
-                formatted_content = workflow.format_comments(pr_data)
-                output_file = getattr(args, 'output', None)
-                workflow.save_to_file(formatted_content, output_file)
+                print(_MODE_HEADERS['save'])
+                workflow.save_to_file(workflow.iter_format_comments(pr_data), getattr(args, 'output', None))
             
             # Provide analysis suggestions
-            print("\n" + "="*60)
-            print("📊 ANALYSIS SUGGESTIONS")
-            print("="*60)
+            print(_MODE_HEADERS['suggestions'])
             suggestions = workflow.analyze_for_response(threads, skip_stats)
             for suggestion in suggestions:
                 print(f"{suggestion}")
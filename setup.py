@@ -57,6 +57,9 @@ setup(
             "black",
             "flake8",
         ],
+        "fast": [
+            "orjson",
+        ],
     },
     entry_points={
         "console_scripts": [